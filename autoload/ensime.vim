@@ -43,6 +43,11 @@ function! ensime#fun_en_complete_func(findstart, base) abort
     return s:call_plugin('fun_en_complete_func', [a:findstart, a:base])
 endfunction
 
+function! ensime#fun_en_prefetch_completions(row, col, line, insert_tick) abort
+    return s:call_plugin('fun_en_prefetch_completions',
+                \ [a:row, a:col, a:line, a:insert_tick])
+endfunction
+
 function! ensime#au_vim_leave(filename) abort
     return s:call_plugin('au_vim_leave', [a:filename])
 endfunction
@@ -63,6 +68,10 @@ function! ensime#au_cursor_moved(filename) abort
     return s:call_plugin('au_cursor_moved', [a:filename])
 endfunction
 
+function! ensime#on_unqueue_timer(timer) abort
+    return s:call_plugin('on_unqueue_timer', [])
+endfunction
+
 function! ensime#com_en_no_teardown(args, range) abort
     return s:call_plugin('com_en_no_teardown', [a:args, a:range])
 endfunction
@@ -171,6 +180,10 @@ function! ensime#com_en_clients(args, range) abort
     return s:call_plugin('com_en_clients', [a:args, a:range])
 endfunction
 
+function! ensime#com_en_stats(args, range) abort
+    return s:call_plugin('com_en_stats', [a:args, a:range])
+endfunction
+
 function! s:call_plugin(method_name, args) abort
     " TODO: support nvim rpc
     if has('nvim')
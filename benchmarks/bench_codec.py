@@ -0,0 +1,63 @@
+# coding: utf-8
+
+"""
+Microbenchmark of the JSON codec against the standard library.
+
+Run with ``python benchmarks/bench_codec.py``, optionally after installing
+``ujson`` to compare backends.
+"""
+
+import json
+import sys
+import timeit
+from os import path
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from ensime_shared import codec  # noqa: E402
+
+import payloads  # noqa: E402
+
+
+def report(name, baseline, candidate):
+    print("{:<40} {:>9.1f} us {:>9.1f} us {:>7.1f}x".format(
+        name, baseline * 1e6, candidate * 1e6, baseline / candidate))
+
+
+def best(stmt, number):
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number
+
+
+def skip_unwanted(raw):
+    """What the reader thread does with notes nobody is buffering."""
+    if codec.peek_call_id(raw) is None:
+        wanted = ("CompletionInfoList", "SymbolInfo")
+        if not any(t in wanted for t in codec.peek_typehints(raw)):
+            return None
+    return codec.loads(raw)
+
+
+def main():
+    completions = payloads.completion_info_list()
+    notes = payloads.new_scala_notes_event()
+    request = payloads.completions_req(payloads.source_text())
+
+    print("codec backend: {}".format(codec.NAME))
+    print("{:<40} {:>12} {:>12} {:>8}".format("", "stdlib json", "codec", "gain"))
+    report("decode CompletionInfoList ({} KB)".format(len(completions) // 1024),
+           best(lambda: json.loads(completions), 200),
+           best(lambda: codec.loads(completions), 200))
+    report("decode NewScalaNotesEvent ({} KB)".format(len(notes) // 1024),
+           best(lambda: json.loads(notes), 50),
+           best(lambda: codec.loads(notes), 50))
+    report("skip unwanted NewScalaNotesEvent",
+           best(lambda: json.loads(notes), 50),
+           best(lambda: skip_unwanted(notes), 50))
+    report("encode CompletionsReq ({} KB)".format(
+        len(request["req"]["fileInfo"]["contents"]) // 1024),
+        best(lambda: json.dumps(request), 50),
+        best(lambda: codec.dumps(request), 50))
+
+
+if __name__ == "__main__":
+    main()
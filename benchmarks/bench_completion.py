@@ -0,0 +1,88 @@
+# coding: utf-8
+
+"""
+Microbenchmark of the formatting of completion suggestions.
+
+Run with ``python benchmarks/bench_completion.py``. Every completion of a
+response used to be formatted as a suggestion as soon as it was received,
+signatures included. They are now formatted once shown, with the formats of
+parameter sections and types memoized across responses.
+"""
+
+import json
+import sys
+import timeit
+from os import path
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from ensime_shared.completion import CompletionCache  # noqa: E402
+
+import payloads  # noqa: E402
+
+
+def best(stmt, number):
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number
+
+
+def report(name, baseline, candidate):
+    print("{:<40} {:>9.1f} us {:>9.1f} us {:>7.1f}x".format(
+        name, baseline * 1e6, candidate * 1e6, baseline / candidate))
+
+
+def param_type(ptype):
+    pt_name = ptype["name"]
+    if pt_name.startswith("<byname>"):
+        pt_name = pt_name.replace("<byname>[", "=> ")[:-1]
+    elif pt_name.startswith("<repeated>"):
+        pt_name = pt_name.replace("<repeated>[", "")[:-1] + "*"
+    return pt_name
+
+
+def param_section(section):
+    implicit = "implicit " if section["isImplicit"] else ""
+    params = [": ".join((p[0], param_type(p[1]))) for p in section["params"]]
+    return "({}{})".format(implicit, ", ".join(params))
+
+
+def suggest(completion):
+    """Suggestion as ``completion_to_suggest`` used to format it."""
+    t_info = completion["typeInfo"]
+    sig = completion["name"]
+    if completion["isCallable"] and t_info["paramSections"]:
+        sig += "".join(param_section(ps) for ps in t_info["paramSections"])
+    menu = t_info["resultType"]["name"] if completion["isCallable"] else t_info["name"]
+    return {"word": completion["name"], "abbr": sig, "menu": menu, "dup": 1}
+
+
+def eager(completions, prefixes):
+    [suggest(c) for c in completions]
+    lazy(completions, prefixes)
+
+
+def lazy(completions, prefixes):
+    cache = CompletionCache(max_results=1000)
+    cache.store("context", prefixes[0], completions)
+    for prefix in prefixes:
+        cache.rank(prefix)
+
+
+def main():
+    completions = json.loads(payloads.completion_info_list())["payload"]["completions"]
+    # Typing on after the first popup narrows it down to a few suggestions
+    typing = ["ma", "map", "map1", "map12"]
+
+    print("{:<40} {:>12} {:>12} {:>8}".format("", "eager", "lazy", "gain"))
+    report("show {} completions".format(len(completions)),
+           best(lambda: eager(completions, typing[:1]), 200),
+           best(lambda: lazy(completions, typing[:1]), 200))
+    report("show them and type 3 characters",
+           best(lambda: eager(completions, typing), 200),
+           best(lambda: lazy(completions, typing), 200))
+    report("show the 11 completing map1",
+           best(lambda: eager(completions, ["map1"]), 200),
+           best(lambda: lazy(completions, ["map1"]), 200))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# coding: utf-8
+
+"""
+Microbenchmark of the Scala lexer against the approaches it replaced.
+
+Run with ``python benchmarks/bench_lexer.py``. Finding the identifier under
+the cursor used to take the ``normal e`` and ``normal b`` motions plus two
+cursor reads. If a Neovim instance is listening at ``$NVIM_LISTEN_ADDRESS``
+and the ``neovim`` module is installed, that is measured too, otherwise only
+the lexer is.
+"""
+
+import os
+import sys
+import timeit
+from os import path
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from ensime_shared import lexer  # noqa: E402
+
+import payloads  # noqa: E402
+
+
+def best(stmt, number):
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number
+
+
+def report(name, baseline, candidate):
+    if baseline is None:
+        print("{:<40} {:>12} {:>9.1f} us".format(name, "-", candidate * 1e6))
+    else:
+        print("{:<40} {:>9.1f} us {:>9.1f} us {:>7.1f}x".format(
+            name, baseline * 1e6, candidate * 1e6, baseline / candidate))
+
+
+def scan_back(line, col):
+    """Completion start as ``complete_func`` used to find it."""
+    start = col
+    while start > 0 and line[start - 1] not in " .":
+        start -= 1
+    return start
+
+
+def extract_package_name(lines):
+    """Package extraction as ``Util.extract_package_name`` used to do it."""
+    found_package = False
+    package = ""
+    for line in lines:
+        if "package" not in line and not found_package:
+            continue
+        elif "package" in line:
+            if not package:
+                package = line.split("package ")[-1].replace("\n", "")
+            else:
+                package += "." + line.split("package ")[-1].replace("\n", "")
+        else:
+            break
+    return package
+
+
+def motions(nvim, row, col):
+    """Identifier bounds as ``start_end_pos`` used to find them."""
+    nvim.current.window.cursor = (row, col)
+    nvim.command("normal e")
+    e = nvim.current.window.cursor
+    nvim.command("normal b")
+    b = nvim.current.window.cursor
+    return b, e
+
+
+def attach_nvim(lines):
+    address = os.environ.get("NVIM_LISTEN_ADDRESS")
+    if not address:
+        return None
+    try:
+        import neovim
+    except ImportError:
+        return None
+    nvim = neovim.attach("socket", path=address)
+    nvim.command("enew")
+    nvim.current.buffer[:] = lines
+    return nvim
+
+
+def main():
+    lines = payloads.source_text().split("\n")
+    source = ["package com.example", "package service", ""] + lines
+    line = lines[len(lines) // 2]
+    col = line.index("find") + 2
+    nvim = attach_nvim(lines)
+
+    print("{:<40} {:>12} {:>12} {:>8}".format("", "before", "lexer", "gain"))
+    report("identifier under the cursor",
+           best(lambda: motions(nvim, len(lines) // 2, col), 100) if nvim else None,
+           best(lambda: lexer.identifier_span(line, col), 10000))
+    report("completion start",
+           best(lambda: scan_back(line, col), 10000),
+           best(lambda: lexer.completion_start(line, col), 10000))
+    report("package of a {} lines file".format(len(source)),
+           best(lambda: extract_package_name(source), 100),
+           best(lambda: lexer.package_clauses(source), 100))
+
+
+if __name__ == "__main__":
+    main()
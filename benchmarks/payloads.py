@@ -0,0 +1,102 @@
+# coding: utf-8
+
+"""
+Sample ENSIME server messages for the benchmarks.
+
+They reproduce the shape and size of messages recorded from a server working
+on a large Scala project, with generated names and positions.
+"""
+
+import json
+
+SOURCE_FILE = "/home/user/project/src/main/scala/com/example/service/OrderService.scala"
+
+
+def basic_type(name, full_name=None, decl_as="Class"):
+    return {
+        "typehint": "BasicTypeInfo",
+        "name": name,
+        "fullName": full_name or "scala.collection.immutable." + name,
+        "declAs": {"typehint": decl_as},
+        "typeArgs": [],
+        "members": [],
+        "typeParams": [],
+    }
+
+
+def completion(i):
+    """A completion like the collection methods returned for `xs.`"""
+    if i % 3 == 0:
+        return {
+            "typeInfo": basic_type("Int", "scala.Int"),
+            "name": "size{}".format(i),
+            "relevance": 90 - i % 50,
+            "isCallable": False,
+        }
+    params = [["f{}".format(i), basic_type("<byname>[A => B]")],
+              ["xs", basic_type("<repeated>[Seq[A]]")]]
+    return {
+        "typeInfo": {
+            "typehint": "ArrowTypeInfo",
+            "name": "(f: A => B)List[B]",
+            "resultType": basic_type("List[B]"),
+            "paramSections": [
+                {"params": params, "isImplicit": False},
+                {"params": [["cbf", basic_type("CanBuildFrom[List[A], B, That]")]],
+                 "isImplicit": True},
+            ],
+            "typeParams": [],
+        },
+        "name": "map{}".format(i),
+        "relevance": 90 - i % 50,
+        "isCallable": True,
+    }
+
+
+def completion_info_list(count=100, call_id=42):
+    payload = {
+        "typehint": "CompletionInfoList",
+        "prefix": "ma",
+        "completions": [completion(i) for i in range(count)],
+    }
+    return json.dumps({"callId": call_id, "payload": payload})
+
+
+def note(i):
+    return {
+        "file": SOURCE_FILE,
+        "msg": "type mismatch;\n found   : Option[Order]\n required: Order ({})".format(i),
+        "severity": {"typehint": "NoteError" if i % 4 else "NoteWarn"},
+        "beg": 1000 + i * 40,
+        "end": 1012 + i * 40,
+        "line": 20 + i,
+        "col": 8,
+    }
+
+
+def new_scala_notes_event(count=500):
+    payload = {
+        "typehint": "NewScalaNotesEvent",
+        "isFull": False,
+        "notes": [note(i) for i in range(count)],
+    }
+    return json.dumps({"payload": payload})
+
+
+def source_text(lines=5000):
+    line = '    val order{0} = repository.find(OrderId("{0}")).map(_.total).getOrElse(0)'
+    return "\n".join(line.format(i) for i in range(lines))
+
+
+def completions_req(contents, call_id=42):
+    return {
+        "callId": call_id,
+        "req": {
+            "typehint": "CompletionsReq",
+            "point": len(contents) // 2,
+            "maxResults": 100,
+            "caseSens": True,
+            "fileInfo": {"file": SOURCE_FILE, "contents": contents},
+            "reload": False,
+        },
+    }
@@ -0,0 +1,79 @@
+# coding: utf-8
+
+"""
+Views of the contents of Vim buffers.
+"""
+
+from bisect import bisect_right
+
+
+class LineIndex(object):
+    """Offsets of the start of each line of a text, to convert positions.
+
+    Rows are 1-based and columns 0-based, like Vim's cursor. Offsets count
+    the newline terminating each line.
+    """
+
+    def __init__(self, lines):
+        self.starts = [0]
+        offset = 0
+        for line in lines:
+            offset += len(line) + 1
+            self.starts.append(offset)
+
+    def __len__(self):
+        return len(self.starts) - 1
+
+    def offset(self, row, col):
+        """Offset of the position at `row` and `col`."""
+        return self.starts[row - 1] + col
+
+    def position(self, offset):
+        """Row and column of `offset`, clamped to the last line."""
+        row = min(bisect_right(self.starts, offset), max(len(self), 1))
+        return row, offset - self.starts[row - 1]
+
+
+class BufferMirror(object):
+    """Copy of the lines of a buffer, at a given `changedtick`.
+
+    The changes of an `attached` buffer are sent by Neovim and applied to the
+    mirror as they come, so it never needs to be read again. Other mirrors
+    are copied again from Vim whenever the buffer has changed.
+    """
+
+    def __init__(self, changedtick, lines, attached=False):
+        self.changedtick = changedtick
+        self.lines = list(lines)
+        self.attached = attached
+        self._index = None
+        self._content = None
+
+    def apply(self, changedtick, first, last, lines):
+        """Replace the lines from `first` to `last` excluded by `lines`.
+
+        Lines are 0-based and a `last` of -1 stands for the end of the buffer,
+        as in Neovim's ``nvim_buf_lines_event``. Changes without a
+        `changedtick` are only shown on screen, e.g. an 'inccommand' preview,
+        they are ignored.
+        """
+        if changedtick is None:
+            return
+        if last == -1:
+            last = len(self.lines)
+        self.lines[first:last] = lines
+        self.changedtick = changedtick
+        self._index = None
+        self._content = None
+
+    def index(self):
+        """The `LineIndex` of the lines, built once per change."""
+        if self._index is None:
+            self._index = LineIndex(self.lines)
+        return self._index
+
+    def content(self):
+        """The text of the buffer, joined once per change."""
+        if self._content is None:
+            self._content = "\n".join(self.lines)
+        return self._content
@@ -0,0 +1,57 @@
+# coding: utf-8
+
+"""
+JSON encoding and decoding of the messages exchanged with the ENSIME server.
+
+The fastest JSON library installed is used, falling back to the standard
+library. Messages can also be peeked at to decide whether they are worth
+decoding at all.
+"""
+
+import json
+import re
+
+try:
+    import ujson as backend
+except ImportError:
+    backend = json
+
+NAME = backend.__name__
+"""Name of the JSON library in use."""
+
+_CALL_ID = re.compile(r'"callId"\s*:\s*(\d+)')
+_TYPEHINT = re.compile(r'"typehint"\s*:\s*"([^"]+)"')
+
+
+def dumps(obj):
+    """Encode a message to be sent to the server."""
+    return backend.dumps(obj)
+
+
+def loads(raw):
+    """Decode a message received from the server.
+
+    Raises ``ValueError`` if it is not valid JSON.
+    """
+    return backend.loads(raw)
+
+
+def peek_call_id(raw):
+    """Return the `callId` of an encoded message, None for events.
+
+    A quote inside a JSON string is always escaped, so keys can't be matched
+    by the contents of string values.
+    """
+    match = _CALL_ID.search(raw)
+    return int(match.group(1)) if match else None
+
+
+def peek_typehints(raw):
+    """Iterate over all the `typehint` values of an encoded message.
+
+    The type of the payload is among them, the others belong to nested
+    objects, so a message whose typehints are all of no interest can be
+    skipped without decoding it.
+    """
+    for match in _TYPEHINT.finditer(raw):
+        yield match.group(1)
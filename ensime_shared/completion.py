@@ -0,0 +1,136 @@
+# coding: utf-8
+
+"""
+Client-side cache of completion suggestions.
+
+The server filters completions by the prefix typed so far. As long as the
+user keeps typing the same identifier, its answer for a shorter prefix can be
+filtered and ranked locally instead of asking again.
+"""
+
+from ensime_shared.symbol_format import completion_to_suggest
+
+PREFIX, IPREFIX, HUMPS, FUZZY = range(4)
+"""Match kinds, best first."""
+
+
+def humps(name):
+    """Lowercase initials of the words of a camelCase or snake_case name."""
+    initials = []
+    previous = "_"
+    for ch in name:
+        if ch != "_" and (previous == "_" or (ch.isupper() and not previous.isupper())):
+            initials.append(ch)
+        previous = ch
+    return "".join(initials).lower()
+
+
+def is_subsequence(needle, haystack):
+    """Whether the characters of `needle` appear in order in `haystack`."""
+    position = 0
+    for ch in needle:
+        position = haystack.find(ch, position) + 1
+        if not position:
+            return False
+    return True
+
+
+class Candidate(object):
+    """A completion indexed by its name, for matching prefixes.
+
+    It is only formatted as a suggestion for Vim once it's shown.
+    """
+
+    __slots__ = ("name", "lower", "completion", "_humps", "_suggestion")
+
+    def __init__(self, completion):
+        self.name = completion["name"]
+        self.lower = self.name.lower()
+        self.completion = completion
+        self._humps = None
+        self._suggestion = None
+
+    @property
+    def humps(self):
+        if self._humps is None:
+            self._humps = humps(self.name)
+        return self._humps
+
+    @property
+    def suggestion(self):
+        if self._suggestion is None:
+            self._suggestion = completion_to_suggest(self.completion)
+        return self._suggestion
+
+    def match(self, prefix, lower):
+        """Return how `prefix`, lowercased as `lower`, matches, or None."""
+        if self.name.startswith(prefix):
+            return PREFIX
+        if self.lower.startswith(lower):
+            return IPREFIX
+        if self.humps.startswith(lower):
+            return HUMPS
+        if is_subsequence(lower, self.lower):
+            return FUZZY
+        return None
+
+
+class CompletionCache(object):
+    """Completions of the latest completion request, for a given context.
+
+    The context identifies where the identifier being completed starts, e.g.
+    the file, offset and text before it. Suggestions can be reused in the
+    same context for any prefix extending the one they were requested for,
+    unless the server may have left some out because of `max_results`.
+    Only the suggestions matching the prefix are formatted.
+    """
+
+    def __init__(self, max_results):
+        self.max_results = max_results
+        self.context = None
+        self.prefix = None
+        self.truncated = False
+        self.candidates = []
+        self.hits = 0
+        self.misses = 0
+
+    def store(self, context, prefix, completions, max_results=None):
+        """Cache the `completions` returned for `prefix` in `context`.
+
+        They were requested with `max_results`, if not the default one.
+        """
+        self.context = context
+        self.prefix = prefix
+        self.truncated = len(completions) >= (max_results or self.max_results)
+        self.candidates = [Candidate(c) for c in completions]
+
+    def clear(self):
+        self.context = None
+        self.candidates = []
+
+    def lookup(self, context, prefix):
+        """Return the ranked suggestions for `prefix` in `context`.
+
+        Returns None if they can't be told from the cache, a request is
+        needed then.
+        """
+        reusable = context == self.context and prefix.startswith(self.prefix)
+        if not reusable or (self.truncated and prefix != self.prefix):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self.rank(prefix)
+
+    def rank(self, prefix):
+        """Suggestions matching `prefix`, best matches first.
+
+        Matches of the same kind keep the order of the server, by relevance.
+        """
+        lower = prefix.lower()
+        matches = []
+        for i, candidate in enumerate(self.candidates):
+            kind = candidate.match(prefix, lower)
+            if kind is not None:
+                matches.append((kind, i, candidate))
+        matches.sort()
+        return [candidate.suggestion for _, _, candidate in matches]
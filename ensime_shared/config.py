@@ -25,24 +25,29 @@ feedback = {
     "notify_break": "Execution breaked at {} {}",
     "prompt_server_install":
         "Please run :EnInstall to install the ENSIME server for Scala {scala_version}",
+    "reconnected": "Reconnected to the server",
+    "send_queue_full": "Too many requests waiting for the server, try again later",
     "spawned_browser": "Opened tab {}",
     "start_message": "Server has been started...",
+    "stats_exported": "Statistics exported to {}",
     "typechecking": "Typechecking...",
     "unhandled_response": "Response {} has not been handled",
     "unknown_symbol": "Symbol not found",
 }
 
 commands = {
-    "enerror_matcher": "matchadd('EnErrorStyle', '\\%{}l\\%>{}c\\%<{}c')",
+    "enerror_matchaddpos": "map({}, 'matchaddpos(\"EnErrorStyle\", v:val)')",
+    "enerror_matchdelete": "map({}, 'matchdelete(v:val)')",
+    "has_namespaces": "exists('*nvim_buf_clear_namespace')",
     "highlight_enerror": "highlight EnErrorStyle ctermbg=red gui=underline",
     "exists_enerrorstyle": "exists('g:EnErrorStyle')",
     "set_enerrorstyle": "let g:EnErrorStyle='EnError'",
     # http://vim.wikia.com/wiki/Timer_to_execute_commands_periodically
     # Set to low values to improve responsiveness
     "set_updatetime": "set updatetime=1000",
+    "has_timers": "has('timers')",
+    "unqueue_timer": "call timer_start(0, 'ensime#on_unqueue_timer')",
     "current_file": "expand('%:p')",
-    "until_last_char_word": "normal e",
-    "until_first_char_word": "normal b",
     # Avoid to trigger requests to server when writing
     "write_file": "noautocmd w",
     "input_save": "call inputsave()",
@@ -60,9 +65,13 @@ commands = {
     "doautocmd_bufreadenter": "doautocmd BufReadPre,BufRead,BufEnter",
     "filetype": "&filetype",
     "set_filetype": "set filetype={}",
-    "go_to_char": "goto {}",
+    "changedtick": "b:changedtick",
+    "modified": "&modified",
+    "mode": "mode()",
+    "insert_tick": "get(b:, 'ensime_insert_tick', -1)",
     "set_ensime_completion": "set omnifunc=EnCompleteFunc",
     "set_quickfix_list": "call setqflist({}, '')",
+    "append_quickfix_list": "call setqflist({}, 'a')",
     "open_quickfix": "copen",
     "disable_plugin": "set runtimepath-={}",
     "runtimepath": "&runtimepath",
@@ -74,5 +83,6 @@ commands = {
     "get_cursor_word": 'expand("<cword>")',
     "select_item_list": 'inputlist({})',
     "append_line": 'call append({}, {!r})',
-    "redraw": "redraw!"
+    "redraw": "redraw!",
+    "redraw_changes": "redraw"
 }
@@ -20,11 +20,21 @@ class DebuggerClient(object):
         self.debug_thread_id = payload["threadId"]
 
     def handle_debug_backtrace(self, call_id, payload):
-        """Handle responses `DebugBacktrace`."""
+        """Handle responses `DebugBacktrace`, rendered progressively."""
         frames = payload["frames"]
+
+        def lines():
+            # The JSON array of frames, one frame at a time
+            yield "["
+            for i, frame in enumerate(frames):
+                to_json = json.dumps(frame, indent=2, separators=(",", ": "))
+                last = i == len(frames) - 1
+                for line in (to_json if last else to_json + ",").split("\n"):
+                    yield "  " + line
+            yield "]"
+
         self.vim.command(":split backtrace.json")
-        to_json = json.dumps(frames, indent=2).split("\n")
-        self.vim.current.buffer[:] = to_json
+        self.append_lines(lines(), replace_first=True)
 
 # API Call Build/Send
     def debug_set_break(self, args, range=None):
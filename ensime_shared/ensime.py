@@ -1,30 +1,33 @@
 # coding: utf-8
 
-import sys
 import os
 import inspect
 
 # Ensime shared imports
-from ensime_shared.errors import InvalidJavaPathError
-from ensime_shared.util import catch, module_exists, Util
+from ensime_shared import codec, lexer
+from ensime_shared.buffer import BufferMirror
+from ensime_shared.completion import CompletionCache
+from ensime_shared.errors import InvalidJavaPathError, CallCancelledError, CallTimeoutError, \
+    ConnectionLostError, SendQueueFullError, ErrorIndex
+from ensime_shared.futures import PendingCalls, ResponseFuture
+from ensime_shared.inbox import PriorityInbox, RESPONSES, EVENTS, BULK
+from ensime_shared.util import catch, get_setting, module_exists, Util
 from ensime_shared.launcher import EnsimeLauncher
+from ensime_shared.logger import Logger, DEBUG
+from ensime_shared.profiler import Profiler
 from ensime_shared.debugger import DebuggerClient
 from ensime_shared.protocol import ProtocolHandler, ProtocolHandlerV1, ProtocolHandlerV2
+from ensime_shared.scheduler import RequestScheduler, REPLAYABLE
+from ensime_shared.stats import RequestStats
 from ensime_shared.typecheck import TypecheckHandler
 from ensime_shared.config import gconfig, feedback, commands
 
 from threading import Thread
 from subprocess import Popen, PIPE
 
-import json
+import shutil
+import tempfile
 import time
-import datetime
-
-# Queue depends on python version
-if sys.version_info > (3, 0):
-    from queue import Queue
-else:
-    from Queue import Queue
 
 class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
     """An ENSIME client for a project configuration path (``.ensime``).
@@ -36,13 +39,16 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
     Once constructed, a client instance can either connect to an existing
     ENSIME server or launch a new one with a call to the ``setup()`` method.
 
-    Communication with the server is done over a websocket (`self.ws`). Messages
-    are sent to the server in the calling thread, while messages are received on
-    a separate background thread and enqueued in `self.queue` upon receipt.
+    Communication with the server is done over a websocket (`self.ws`). Requests
+    are scheduled in `self.scheduler` and sent to the server by a background
+    writer thread, while messages are received on another background thread and
+    enqueued in `self.queue` upon receipt, where responses take precedence over
+    events. In Neovim, the editor is then woken up to handle them right away.
 
     Each call to the server contains a `callId` field with an integer ID,
     generated from `self.call_id`. Responses echo back the `callId` field so
-    that appropriate handlers can be invoked.
+    that appropriate handlers can be invoked. Calls awaiting a response are
+    tracked as futures in `self.pending_calls`.
 
     Responses also contain a `typehint` field in their `payload` field, which
     contains the type of the response. This is used to key into `self.handlers`,
@@ -75,10 +81,8 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
                 except OSError:
                     self.log_dir = "/tmp/"
             self.log_file = os.path.join(self.log_dir, "ensime-vim.log")
-            with open(self.log_file, "w") as f:
-                now = datetime.datetime.now()
-                tm = now.strftime("%Y-%m-%d %H:%M:%S.%f")
-                f.write("{}: {} - {}\n".format(tm, "Initializing project", config_dirname))
+            self.log = Logger(self.log_file)
+            self.log.info("Initializing project - {}", config_dirname)
 
         def fetch_runtime_paths():
             """Fetch all the runtime paths of ensime-vim plugin."""
@@ -92,8 +96,30 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
 
         setup_logger_and_paths()
         setup_vim()
+        self.log.set_level(self.get_setting("log_level", "info"))
         self.log("__init__: in")
 
+        self.profiler = None
+        if int(self.get_setting("profile", 0)):
+            self.profiler = Profiler(self.log_dir)
+
+        # Neovim can show completions once they arrive instead of waiting
+        self.async_completion = bool(getattr(self.vim, "session", None)) and \
+            bool(int(self.get_setting("async_completion", 1)))
+        # Completions are requested as soon as one of these is typed
+        self.completion_triggers = tuple(
+            self.get_setting("completion_triggers", ["."]))
+        self.prefetch_max_results = 1000
+
+        # Buffers bigger than this many characters are sent through a scratch
+        # file instead of being inlined in requests
+        self.contents_in_threshold = int(
+            self.get_setting("contents_in_threshold", 32768))
+        # Created on first use, each client has its own not to remove the
+        # files still used by another one on teardown
+        self.scratch_dir = None
+        self.scratch_files = {}
+
         self.ws = None
         self.ensime = None
         self.launcher = launcher
@@ -101,18 +127,31 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
 
         self.call_id = 0
         self.call_options = {}
+        self.pending_calls = PendingCalls()
+        self.scheduler = RequestScheduler()
+        self.stats = RequestStats()
         self.refactor_id = 1
         self.refactorings = {}
         self.receive_callbacks = {}
 
         self.matches = []
-        self.errors = []
-        # Queue for messages received from the ensime server.
-        self.queue = Queue()
+        self.buffer_mirrors = {}
+        self.errors = ErrorIndex()
+        # Queue for messages received from the ensime server, by priority.
+        self.queue = PriorityInbox()
         self.suggestions = None
+        self.completions = None
         self.completion_timeout = 10  # seconds
-        self.completion_started = False
-        self.en_format_source_id = None
+        self.send_timeout = 10  # seconds
+        # Future of the ongoing omni completion request, if any, with the
+        # context, prefix and maximum number of results it was made for
+        self.completion_response = None
+        self.completion_context = None
+        self.completion_point = None
+        # Context of the completions prefetched, until used
+        self.prefetch = None
+        self.completion_cache = CompletionCache(max_results=100)
+        self.response_timeout = 10  # seconds
 
         self.full_types_enabled = False
         """Whether fully-qualified types are displayed by inspections or not"""
@@ -127,60 +166,212 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
         # beforehand since vim.eval is not threadsafe
         self.runtime_paths = fetch_runtime_paths()
 
-        # By default, don't connect to server more than once
+        # By default, don't connect to server more than once, a lost
+        # connection is recovered with `reconnect()` instead
         self.number_try_connection = 1
+        self.reconnecting = False
+        self.reconnected = False
+        self.reconnect_attempts = 8
+        self.reconnect_delay = 0.5  # seconds, doubled after each attempt
+        self.reconnect_max_delay = 30  # seconds
 
         self.debug_thread_id = None
         self.running = True
+        self.wake_up_scheduled = False
+        self.tick_scheduled = False
+
+        # Time spent handling messages per editor tick, the rest is carried
+        # over to the next one so that moving the cursor never stalls
+        self.unqueue_budget = 0.008  # seconds
 
         thread = Thread(target=self.queue_poll, args=())
         thread.daemon = True
         thread.start()
 
+        writer = Thread(target=self.send_poll, args=())
+        writer.daemon = True
+        writer.start()
+
         self.websocket_exists = module_exists("websocket")
         if not self.websocket_exists:
             self.tell_module_missing("websocket-client")
         if not module_exists("sexpdata"):
             self.tell_module_missing("sexpdata")
 
-    def log(self, what):
-        """Log `what` in a file at the .ensime_cache folder or /tmp."""
-        with open(self.log_file, "a") as f:
-            now = datetime.datetime.now()
-            tm = now.strftime("%Y-%m-%d %H:%M:%S.%f")
-            f.write("{}: {}\n".format(tm, what))
-
     def queue_poll(self, sleep_t=0.5):
         """Put new messages on the queue as they arrive. Blocking in a thread.
 
-        Value of sleep is low to improve responsiveness.
+        While connected, this blocks on the websocket so every frame is queued
+        and dispatched as soon as it is received. It only sleeps, `sleep_t`
+        seconds at a time, while there is no connection to read from. A lost
+        connection is recovered from this thread too.
         """
-        connection_alive = True
         while self.running:
-            if self.ws:
-                def logger_and_close(m):
-                    self.log("Websocket exception: {}".format(m))
-                    if not self.running:
-                        # Tear down has been invoked
-                        # Prepare to exit the program
-                        connection_alive = False
-                    else:
-                        if not self.number_try_connection:
-                            # Stop everything and disable plugin
-                            self.teardown()
-                            self.disable_plugin()
-
-                # WebSocket exception may happen
-                with catch(Exception, logger_and_close):
-                    result = self.ws.recv()
-                    self.queue.put(result)
-
-            if connection_alive:
+            if not self.ws:
                 time.sleep(sleep_t)
+                continue
+
+            from websocket import WebSocketTimeoutException
+            received = None
+            # WebSocket exception may happen
+            try:
+                received = self.ws.recv()
+            except WebSocketTimeoutException:
+                # Nothing to read for `self.send_timeout` seconds
+                continue
+            except Exception as e:
+                self.log.warning("Websocket exception: {}", e)
+                if self.running:
+                    self.reconnect()
+                continue
+
+            if self.on_message(received):
+                self.wake_up()
+
+    def reconnect(self):
+        """Reconnect to the server after losing the connection.
+
+        Attempts are spaced with an exponential backoff. Meanwhile, requests
+        that were in flight are replayed if they are `REPLAYABLE`, or failed
+        with ``ConnectionLostError``. The session is restored by the next
+        ``unqueue``. The plugin is only disabled if all attempts fail.
+        """
+        self.reconnecting = True
+        lost, self.ws = self.ws, None
+        with catch(Exception):
+            lost.shutdown()
+        self.recover_calls()
+
+        delay = self.reconnect_delay
+        for attempt in range(1, self.reconnect_attempts + 1):
+            time.sleep(delay)
+            if not self.running:
+                break
+            self.log.info("reconnect: attempt {}", attempt)
+            with catch(Exception, lambda e: self.log.warning("reconnect: {}", e)):
+                self.ws = self.create_websocket()
+            if self.ws:
+                self.reconnecting = False
+                self.reconnected = True
+                self.wake_up()
+                return
+            delay = min(delay * 2, self.reconnect_max_delay)
+
+        self.reconnecting = False
+        if self.running:
+            self.log.error("reconnect: giving up")
+            for response in self.pending_calls.outstanding():
+                self.pending_calls.pop(response.call_id)
+                response.set_exception(
+                    ConnectionLostError(response.call_id, response.typehint))
+            self.teardown()
+            self.disable_plugin()
+
+    def recover_calls(self):
+        """Replay or fail the requests that were in flight."""
+        replays = []
+        for response in self.pending_calls.outstanding():
+            if response.sent_at is None:
+                # Still scheduled, it will be sent once reconnected
+                continue
+            if response.typehint in REPLAYABLE and not response.cancelled():
+                response.queued_at, response.sent_at = time.time(), None
+                replays.append((response, response.message))
+            else:
+                self.pending_calls.pop(response.call_id)
+                response.set_exception(
+                    ConnectionLostError(response.call_id, response.typehint))
+        self.log.info("recover_calls: replaying {}", replays)
+        self.scheduler.requeue(replays)
+
+    def restore_session(self):
+        """Restore the session once reconnected, from the editor thread."""
+        self.log.info("restore_session: in")
+        self.send_request({"typehint": "ConnectionInfoReq"})
+        if self.currently_buffering_typechecks:
+            # Notes of the ongoing typecheck may have been lost, those
+            # already rendered are sent again
+            self.clean_errors()
+            self.start_typechecking()
+            self.send_request({"typehint": "TypecheckFilesReq",
+                               "files": self.typecheck_files})
+        self.message("reconnected")
+
+    def on_message(self, raw):
+        """Decode a message and resolve the call it responds to, if any.
+
+        Runs in the reader thread. Messages are then queued for handling,
+        unless their call has been claimed by whoever sent it. Events that
+        no handler or callback wants are skipped without being decoded.
+        Returns whether the message has been queued.
+        """
+        if not raw or raw == "nil":
+            self.log("on_message: nil or None received")
+            return False
+        self.stats.inbound(len(raw))
+
+        # Watch out, it may not have callId
+        call_id = codec.peek_call_id(raw)
+        if call_id is None and not self.wants_payload(codec.peek_typehints(raw)):
+            self.log("on_message: skipping unwanted event")
+            return False
+
+        def drop(e):
+            self.log.warning("on_message: cannot decode {}: {}", raw, e)
+
+        message = None
+        with catch(ValueError, drop):
+            message = codec.loads(raw)
+        if not message:
+            return False
+
+        response = None
+        if call_id is not None:
+            response = self.pending_calls.pop(call_id)
+        if response:
+            response.received_at = time.time()
+            if not response.set_result(message["payload"]):
+                self.log("on_message: dropping response to cancelled call {}",
+                         call_id)
+                return False
+            # Only once it's sure to be handled, or it would wait to be taken
+            self.stats.received(response)
+            if response.claimed:
+                return False
+
+        self.queue.put(message)
+        return True
+
+    def wants_payload(self, typehints):
+        """Whether a payload with these typehints needs to be handled."""
+        if self.receive_callbacks:
+            return True
+        return any(self.handles(typehint) for typehint in typehints)
+
+    def wake_up(self):
+        """Ask the editor to handle the queued messages as soon as it can.
+
+        Only Neovim can safely be called back from another thread, so in Vim
+        messages are still handled on the next ``CursorHold``/``CursorMoved``,
+        or on a timer to carry on with a backlog.
+        Several messages arriving in a burst are handled by a single call.
+        """
+        if self.wake_up_scheduled:
+            return
+        session = getattr(self.vim, "session", None)
+        if session:
+            self.wake_up_scheduled = True
+            session.threadsafe_call(self.on_wake_up)
+
+    def on_wake_up(self):
+        """Handle the queued messages, from Neovim's main loop or a Vim timer."""
+        self.wake_up_scheduled = False
+        if self.running and self.ws:
+            self.unqueue(budget=self.unqueue_budget)
 
     def on_receive(self, name, callback):
         """Executed when a response is received from the server."""
-        self.log("on_receive: {}".format(callback))
+        self.log("on_receive: {}", callback)
         self.receive_callbacks[name] = callback
 
     def vim_command(self, key):
@@ -193,14 +384,15 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
         vim_cmd = commands[key]
         return self.vim.eval(vim_cmd)
 
+    def get_setting(self, key, default):
+        """Return the value of the global setting `g:ensime_<key>`, or `default`."""
+        return get_setting(self.vim, key, default)
+
     def setup(self, quiet=False, bootstrap_server=False):
         """Check the classpath and connect to the server if necessary."""
         def lazy_initialize_ensime():
             if not self.ensime:
-                called_by = inspect.stack()[4][3]
-                self.log(str(inspect.stack()))
-                self.log("setup(quiet={}, bootstrap_server={}) called by {}()"
-                         .format(quiet, bootstrap_server, called_by))
+                self.log_setup_caller(quiet, bootstrap_server)
                 no_classpath = not os.path.exists(self.launcher.classpath_file)
                 if not bootstrap_server and no_classpath:
                     if not quiet:
@@ -219,13 +411,21 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
         def ready_to_connect():
             if not self.websocket_exists:
                 return False
-            if not self.ws and self.ensime.is_ready():
+            if not self.ws and not self.reconnecting and self.ensime.is_ready():
                 self.connect_ensime_server()
             return True
 
         # True if ensime is up and connection is ok, otherwise False
         return self.running and lazy_initialize_ensime() and ready_to_connect()
 
+    def log_setup_caller(self, quiet, bootstrap_server):
+        """Log who is setting up the client, walking the stack only to debug."""
+        if self.log.enabled(DEBUG):
+            stack = inspect.stack()
+            self.log("{}", stack)
+            self.log("setup(quiet={}, bootstrap_server={}) called by {}()",
+                     quiet, bootstrap_server, stack[5][3])
+
     def tell_module_missing(self, name):
         """Warn users that a module is not available in their machines."""
         msg = feedback["module_missing"]
@@ -236,11 +436,11 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
         def normal_vim(e):
             self.vim.command(command)
         with catch(Exception, normal_vim):
-            self.vim.session.threadsafe_call(command)
+            self.vim.session.threadsafe_call(lambda: self.vim.command(command))
 
     def disable_plugin(self):
         """Disable plugin temporarily, including also related plugins."""
-        self.log("disable_plugin: in")
+        self.log.info("disable_plugin: in")
 
         for path in self.runtime_paths:
             self.log(path)
@@ -252,27 +452,71 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
         display_msg = commands["display_message"].format(warning)
         self.threadsafe_vim(display_msg)
 
+    def send_poll(self, sleep_t=0.5):
+        """Send the scheduled requests as they come. Blocking in a thread.
+
+        Requests that could not be sent within `self.send_timeout` seconds,
+        e.g. while the connection is down, are failed instead of sent late.
+        """
+        while self.running:
+            if not self.ws:
+                time.sleep(sleep_t)
+                continue
+
+            entry = self.scheduler.next(sleep_t)
+            if not entry:
+                continue
+            response, msg = entry
+            if response.cancelled():
+                self.pending_calls.pop(response.call_id)
+            elif time.time() - response.queued_at > self.send_timeout:
+                self.log.warning("send_poll: {} not sent in time", response)
+                self.pending_calls.pop(response.call_id)
+                response.set_exception(CallTimeoutError(
+                    response.call_id, response.typehint, self.send_timeout))
+            else:
+                response.sent_at = time.time()
+                if self.send(msg):
+                    self.stats.sent(response)
+                else:
+                    # Disconnected meanwhile, wait for the connection
+                    response.sent_at = None
+                    self.scheduler.requeue([entry])
+
     def send(self, msg):
-        """Send something to the ensime server."""
-        def reconnect(e):
-            self.log("send error: {}, reconnecting...".format(e))
-            self.connect_ensime_server()
-            if self.ws:
-                self.ws.send(msg + "\n")
+        """Send something to the ensime server, from the writer thread.
+
+        Returns False if there was no connection to send it through.
+        """
+        def connection_lost(e):
+            self.log.warning("send error: {}, reconnecting...", e)
+            # Wake up the reader, which takes care of reconnecting
+            with catch(Exception):
+                self.ws.abort()
 
         self.log("send: in")
         if self.running and self.ws:
-            with catch(Exception, reconnect):
-                self.log("send: {}".format(msg))
+            with catch(Exception, connection_lost):
+                self.log("send: {}", msg)
                 self.ws.send(msg + "\n")
+                self.stats.outbound(len(msg) + 1)
+            return True
+        return False
+
+    def create_websocket(self):
+        """Open a websocket to the server at `self.ensime_server`."""
+        from websocket import create_connection
+        # The timeout bounds connecting and sending, the reader
+        # thread just keeps waiting when receiving times out
+        return create_connection(self.ensime_server, timeout=self.send_timeout)
 
     def connect_ensime_server(self):
         """Start initial connection with the server."""
-        self.log("connect_ensime_server: in")
+        self.log.info("connect_ensime_server: in")
 
         def disable_completely(e):
             if e:
-                self.log("connection error: {}".format(e))
+                self.log.error("connection error: {}", e)
             self.shutdown_server()
             self.disable_plugin()
 
@@ -282,9 +526,7 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
                 port = self.ensime.http_port()
                 self.ensime_server = gconfig["ensime_server"].format(port)
             with catch(Exception, disable_completely):
-                from websocket import create_connection
-                # Use the default timeout (no timeout).
-                self.ws = create_connection(self.ensime_server)
+                self.ws = self.create_websocket()
             if self.ws:
                 self.send_request({"typehint": "ConnectionInfoReq"})
         else:
@@ -293,15 +535,32 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
 
     def shutdown_server(self):
         """Shut down server if it is alive."""
-        self.log("shutdown_server: in")
+        self.log.info("shutdown_server: in")
         if self.ensime and self.toggle_teardown:
             self.ensime.stop()
 
     def teardown(self):
         """Tear down the server or keep it alive."""
-        self.log("teardown: in")
+        self.log.info("teardown: in")
         self.running = False
+        if self.ws:
+            # Wake up the reader blocked in `ws.recv()`
+            with catch(Exception):
+                self.ws.abort()
         self.shutdown_server()
+        if self.scratch_dir:
+            self.scratch_files = {}
+            shutil.rmtree(self.scratch_dir, ignore_errors=True)
+            self.scratch_dir = None
+        if self.profiler:
+            self.log.info("teardown: profile written to {}",
+                          self.profiler.dump())
+
+    def profiled(self, fn, *args, **kwargs):
+        """Call `fn`, profiling it if profiling is enabled."""
+        if self.profiler:
+            return self.profiler.run(fn, *args, **kwargs)
+        return fn(*args, **kwargs)
 
     def cursor(self):
         """Return the row and col of the current buffer."""
@@ -309,7 +568,7 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
 
     def set_cursor(self, row, col):
         """Set cursor at a given row and col in a buffer."""
-        self.log("set_cursor: {}".format((row, col)))
+        self.log("set_cursor: {}", (row, col))
         self.vim.current.window.cursor = (row, col)
 
     def width(self):
@@ -322,12 +581,12 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
         return self.vim.current.buffer.name
 
     def start_end_pos(self):
-        """Return start and end positions of the cursor respectively."""
-        self.vim_command("until_last_char_word")
-        e = self.cursor()
-        self.vim_command("until_first_char_word")
-        b = self.cursor()
-        return b, e
+        """Return the positions of the first and last characters of the
+        identifier under the cursor, or of the cursor if there is none."""
+        row, col = self.cursor()
+        line = self.buffer_mirror().lines[row - 1]
+        start, end = lexer.identifier_span(line, col) or (col, col + 1)
+        return (row, start), (row, end - 1)
 
     def send_at_position(self, what, where="range"):
         self.log("send_at_position: in")
@@ -341,27 +600,100 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
         if decl_pos["typehint"] == "LineSourcePosition":
             self.set_cursor(decl_pos['line'], 0)
         else:  # OffsetSourcePosition
-            point = decl_pos["offset"]
-            cmd = commands["go_to_char"].format(str(point + 1))
-            self.vim.command(cmd)
+            row, col = self.line_index().position(decl_pos["offset"])
+            self.set_cursor(row, col)
 
     def get_position(self, row, col):
         """Get char position in all the text from row and column."""
-        result = col
-        self.log("{} {}".format(row, col))
-        lines = self.vim.current.buffer[:row - 1]
-        result += sum([len(l) + 1 for l in lines])
-        self.log("{}".format(result))
+        result = self.line_index().offset(row, col)
+        self.log("get_position: {} {} is {}", row, col, result)
         return result
 
+    def line_index(self):
+        """Return the `LineIndex` of the current buffer."""
+        return self.buffer_mirror().index()
+
+    def buffer_mirror(self):
+        """Return the `BufferMirror` of the current buffer.
+
+        In Neovim, buffers are attached to keep their mirror up to date
+        without reading them again. In Vim, the buffer is only read again
+        when its `b:changedtick` has moved since the last call.
+        """
+        buf = self.vim.current.buffer
+        mirror = self.buffer_mirrors.get(buf.number)
+        if mirror and mirror.attached:
+            return mirror
+
+        tick = int(self.vim_eval("changedtick"))
+        if not mirror or mirror.changedtick != tick:
+            attached = self.attach_buffer(buf)
+            mirror = BufferMirror(tick, buf[:], attached)
+            self.buffer_mirrors[buf.number] = mirror
+        return mirror
+
+    def attach_buffer(self, buf):
+        """Ask Neovim to send the changes of `buf`, returns whether it will."""
+        attached = False
+        if getattr(self.vim, "session", None):
+            with catch(Exception, lambda e: self.log.warning(
+                    "attach_buffer: {}", e)):
+                attached = bool(self.vim.api.buf_attach(buf, False, {}))
+        return attached
+
+    def on_buffer_lines(self, number, changedtick, first, last, lines):
+        """Apply the changes of an attached buffer to its mirror."""
+        mirror = self.buffer_mirrors.get(number)
+        if mirror:
+            mirror.apply(changedtick, first, last, lines)
+
+    def on_buffer_changedtick(self, number, changedtick):
+        mirror = self.buffer_mirrors.get(number)
+        if mirror:
+            mirror.changedtick = changedtick
+
+    def on_buffer_detach(self, number):
+        self.buffer_mirrors.pop(number, None)
+
     def get_file_content(self):
         """Get content of file."""
-        return "\n".join(self.vim.current.buffer)
+        return self.buffer_mirror().content()
 
     def get_file_info(self):
-        """Returns filename and content of a file."""
-        return {"file": self.path(),
-                "contents": self.get_file_content()}
+        """Returns filename and content of a file.
+
+        The content is only sent when the buffer has unsaved changes, the
+        server reads the file itself otherwise. It's joined once per change
+        of the buffer however many requests send it.
+        """
+        path = self.path()
+        if not int(self.vim_eval("modified")):
+            return {"file": path}
+
+        mirror = self.buffer_mirror()
+        if len(mirror.content()) < self.contents_in_threshold:
+            return {"file": path, "contents": mirror.content()}
+        return {"file": path, "contentsIn": self.write_scratch_file(path, mirror)}
+
+    def write_scratch_file(self, path, mirror):
+        """Write the content of the buffer of `path` to a scratch file.
+
+        It's only written again when the buffer has changed. Returns the path
+        of the scratch file.
+        """
+        if not self.scratch_dir:
+            self.scratch_dir = tempfile.mkdtemp(prefix="ensime-vim-scratch-",
+                                                dir=self.log_dir)
+        name = "{:x}-{}".format(hash(path) & 0xffffffff, os.path.basename(path))
+        scratch = os.path.join(self.scratch_dir, name)
+        if self.scratch_files.get(scratch) != mirror.changedtick:
+            content = mirror.content()
+            if not isinstance(content, bytes):
+                content = content.encode("utf-8")
+            with open(scratch, "wb") as f:
+                f.write(content)
+            self.scratch_files[scratch] = mirror.changedtick
+        return scratch
 
     def ask_input(self, message='input: '):
         """Ask input to vim and display info string."""
@@ -409,8 +741,8 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
                 fqn.insert(0, ln.split()[-1])
 
         symbolName = ".".join(fqn)
-        self.symbol_by_name([symbolName])
-        self.unqueue(should_wait=True)
+        response = self.symbol_by_name([symbolName], future=True)
+        self.handle_response(response, self.response_timeout)
 
     def to_quickfix_item(self, file_name, line_number, message, tpe):
         return { "filename" : file_name,
@@ -418,7 +750,7 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
          "text"     : message,
          "type"     : tpe }
 
-    def symbol_by_name(self, args, range=None):
+    def symbol_by_name(self, args, range=None, future=False):
         self.log("symbol_by_name: in")
         if not args:
             msg = commands["display_message"].format("Must provide a fully qualifed symbol name")
@@ -434,21 +766,52 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
         }
         if len(args) == 2:
             req["memberName"] = args[1]
-        self.send_request(req)
+        return self.send_request(req, future)
+
+    def write_quickfix_list(self, qf_items, page_size=200):
+        """Fill the quickfix list from an iterable, `page_size` items at a time.
 
-    def write_quickfix_list(self, qf_list):
-        cmd = commands["set_quickfix_list"].format(str(qf_list))
-        self.vim.command(cmd)
-        self.vim_command("open_quickfix")
+        The list is opened with the first page, so it shows up before all the
+        items have been rendered.
+        """
+        key = "set_quickfix_list"
+        for page in Util.pages(qf_items, page_size):
+            self.vim.command(commands[key].format(str(page)))
+            if key == "set_quickfix_list":
+                self.vim_command("open_quickfix")
+                key = "append_quickfix_list"
+        if key == "set_quickfix_list":
+            # Nothing to show, but still clear the list
+            self.vim.command(commands[key].format("[]"))
+            self.vim_command("open_quickfix")
+
+    def append_lines(self, lines, page_size=500, replace_first=False):
+        """Append lines to the current buffer, `page_size` lines at a time.
+
+        The screen is redrawn after each page so that the first results show
+        up early, and only one page is held in memory. With `replace_first`,
+        the first line replaces the (empty) first line of the buffer.
+        """
+        buf = self.vim.current.buffer
+        for page in Util.pages(lines, page_size):
+            if replace_first:
+                buf[:] = page
+                replace_first = False
+            else:
+                buf.append(page)
+            self.vim_command("redraw_changes")
 
-    def complete(self, row, col):
+    def complete(self, row, col, max_results):
+        """Request completions at a position, returns a claimed future."""
         self.log("complete: in")
         pos = self.get_position(row, col)
-        self.send_request({"point": pos, "maxResults": 100,
-                           "typehint": "CompletionsReq",
-                           "caseSens": True,
-                           "fileInfo": self.get_file_info(),
-                           "reload": False})
+        return self.send_request({"point": pos,
+                                  "maxResults": max_results,
+                                  "typehint": "CompletionsReq",
+                                  "caseSens": True,
+                                  "fileInfo": self.get_file_info(),
+                                  "reload": False},
+                                 future=True)
 
     def send_at_point_req(self, what, path, row, col, size, where="range"):
         """Ask the server to perform an operation at a given position."""
@@ -481,10 +844,12 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
         self.log("en_install: in")
 
     def format_source(self, args, range=None):
-        self.log("type_check_cmd: in")
+        self.log("format_source: in")
         req = {"typehint": "FormatOneSourceReq",
                "file": self.get_file_info()}
-        self.en_format_source_id = self.send_request(req)
+        response = self.send_request(req, future=True)
+        self.handle_response(response, self.response_timeout,
+                             {"StringResponse": self.handle_formatted_source})
 
     def type(self, args, range=None):
         self.log("type: in")
@@ -499,6 +864,23 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
         else:
             self.message("full_types_enabled_off")
 
+    def show_stats(self, args, range=None):
+        """Display the request statistics, or export them with `export`."""
+        self.log("show_stats: in")
+        lanes = self.queue.depths()
+        depths = {"responses": lanes[RESPONSES],
+                  "events": lanes[EVENTS],
+                  "notes": lanes[BULK],
+                  "unsent": len(self.scheduler),
+                  "in flight": len(self.pending_calls)}
+        if args and args[0] == "export":
+            path = os.path.join(self.log_dir, "ensime-vim-stats.json")
+            self.stats.export(path, depths)
+            self.raw_message(feedback["stats_exported"].format(path))
+        else:
+            for line in self.stats.report(depths):
+                self.raw_message(line)
+
     def symbol_at_point_req(self, open_definition, display=False):
         opts = self.call_options.get(self.call_id)
         if opts:
@@ -518,7 +900,7 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
     def inspect_package(self, args):
         pkg = None
         if not args:
-            pkg = Util.extract_package_name(self.vim.current.buffer)
+            pkg = ".".join(lexer.package_clauses(self.buffer_mirror().lines))
             msg = commands["display_message"].format("Using Currently Focused Package")
             self.vim.command(msg)
         else:
@@ -691,79 +1073,200 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
             self.vim.command(cmd)
             self.vim_command("doautocmd_bufreadenter")
 
-    def send_request(self, request):
-        """Send a request to the server."""
+    def send_request(self, request, future=False):
+        """Send a request to the server, without waiting for it to be sent.
+
+        Requests go through `self.scheduler` to the writer thread, they wait
+        there while there is no connection. A cursor-driven request supersedes
+        the previous one of the same kind, which is dropped if not sent yet,
+        or whose response is dropped otherwise. If too many requests are
+        already waiting, the request is cancelled and the user is warned.
+
+        Returns the `callId` of the request, or if `future` is set, a claimed
+        ``ResponseFuture``: its response won't be queued for the regular
+        handlers, see ``handle_response``.
+        """
         self.log("send_request: in")
-        self.send(json.dumps({"callId": self.call_id, "req": request}))
         call_id = self.call_id
         self.call_id += 1
-        return call_id
+        response = ResponseFuture(call_id, request, claimed=future)
+        self.pending_calls.add(response)
+        msg = codec.dumps({"callId": call_id, "req": request})
+        response.message = msg
+        try:
+            coalesced, superseded = self.scheduler.submit(response, msg)
+        except SendQueueFullError as e:
+            self.log.warning("send_request: {}", e)
+            self.pending_calls.pop(call_id)
+            response.cancel()
+            self.message("send_queue_full")
+            return response if future else call_id
+
+        for older in coalesced:
+            self.pending_calls.pop(older.call_id)
+        for older in coalesced + superseded:
+            self.log("send_request: {} superseded by {}", older, response)
+            self.call_options.pop(older.call_id, None)
+            older.cancel()
+
+        return response if future else call_id
+
+    def handle_response(self, response, timeout, handlers=None):
+        """Wait for the response to a claimed call and handle it.
+
+        Only `response` is handled, in the calling thread, as soon as it
+        arrives; other messages stay queued. `handlers` override the ones
+        registered for the response types they are given for, an error is
+        still handled as usual. If the response doesn't arrive within
+        `timeout` seconds the call is cancelled and a late response will be
+        dropped, nothing is handled either if the connection was lost
+        meanwhile. Returns whether the response has been handled.
+        """
+        def give_up(e):
+            response.cancel()
+            self.log.warning("handle_response: {}", e)
+
+        payload = None
+        with catch((CallTimeoutError, CallCancelledError, ConnectionLostError),
+                   give_up):
+            payload = response.result(timeout)
+        if payload is None:
+            return False
+
+        started = time.time()
+        handler = (handlers or {}).get(payload.get("typehint"))
+        if handler:
+            self.trigger_callbacks(payload)
+            self.profiled(handler, response.call_id, payload)
+        else:
+            self.handle_message(response.call_id, payload)
+        self.stats.handled(response, started)
+        return True
 
     def clean_errors(self):
         """Clean errors and unhighlight them in vim."""
-        self.vim.eval("clearmatches()")
+        self.clear_error_highlights()
         self.vim_command('syntastic_reset_notes')
         self.matches = []
-        self.errors = []
+        self.errors = ErrorIndex()
+        # Streamed notes are kept, to be rendered again in the buffer
+        self.rendered_notes = None
 
     def buffer_leave(self, filename):
         """User is changing of buffer."""
-        self.log("buffer_leave: {}".format(filename))
+        self.log("buffer_leave: {}", filename)
         self.clean_errors()
+        # Only attached mirrors are worth keeping for when the user comes back
+        number = self.vim.current.buffer.number
+        mirror = self.buffer_mirrors.get(number)
+        if mirror and not mirror.attached:
+            del self.buffer_mirrors[number]
 
     def type_check(self, filename):
         """Update type checking when user saves buffer."""
         self.log("type_check: in")
+        self.typecheck_files = [self.path()]
         self.send_request(
             {"typehint": "TypecheckFilesReq",
-             "files": [self.path()]})
+             "files": self.typecheck_files})
         self.clean_errors()
 
-    def unqueue(self, timeout=10, should_wait=False):
-        """Unqueue all the received ensime responses for a given file."""
-        def trigger_callbacks(_json):
-            for name in self.receive_callbacks:
-                self.log("launching callback: {}".format(name))
-                self.receive_callbacks[name](self, _json["payload"])
+    def trigger_callbacks(self, payload):
+        """Run the callbacks registered with ``on_receive``."""
+        for name in self.receive_callbacks:
+            self.log("launching callback: {}", name)
+            self.receive_callbacks[name](self, payload)
+
+    def handle_message(self, call_id, payload):
+        """Run the callbacks and the handler for a received payload."""
+        if payload:
+            self.trigger_callbacks(payload)
+            self.profiled(self.handle_incoming_response, call_id, payload)
 
-        start, now = time.time(), time.time()
+    def unqueue(self, timeout=10, should_wait=False, budget=None):
+        """Unqueue all the received ensime responses for a given file.
+
+        If a `budget` is given, messages are handled for at most that many
+        seconds and the backlog is carried over to the next tick.
+        """
+        self.tick_scheduled = False
+        if self.reconnected:
+            self.reconnected = False
+            self.restore_session()
+
+        tick = start = now = time.time()
+        handled = False
         wait = self.queue.empty() and should_wait
         while (not self.queue.empty() or wait) and (now - start) < timeout:
             if wait and self.queue.empty():
                 time.sleep(0.25)
                 now = time.time()
             else:
-                result = self.queue.get(False)
-                self.log("unqueue: result received {}".format(str(result)))
-                if result and result != "nil":
-                    wait = None
-                    # Restart timeout
-                    start, now = time.time(), time.time()
-                    _json = json.loads(result)
-                    # Watch out, it may not have callId
-                    call_id = _json.get("callId")
-                    if _json["payload"]:
-                        trigger_callbacks(_json)
-                        self.handle_incoming_response(call_id, _json["payload"])
-                else:
-                    self.log("unqueue: nil or None received")
-
+                message = self.queue.get(False)
+                self.log("unqueue: result received {}", message)
+                wait = None
+                # Restart timeout
+                start, now = time.time(), time.time()
+                call_id = message.get("callId")
+                self.handle_message(call_id, message["payload"])
+                response = self.stats.take(call_id)
+                if response:
+                    self.stats.handled(response, start)
+                handled = True
+                if budget is not None and time.time() - tick >= budget:
+                    self.stats.record("unqueue", "tick", time.time() - tick)
+                    self.carry_over()
+                    return
+
+        # Notes held back by the throttling of redraws
+        self.render_streamed_notes()
         if (now - start) >= timeout:
-            self.log("unqueue: no reply from server for {}s"
-                     .format(timeout))
+            self.log.warning("unqueue: no reply from server for {}s",
+                             timeout)
+        if handled:
+            self.stats.record("unqueue", "tick", time.time() - tick)
+
+    def carry_over(self):
+        """Leave the queued messages to the next tick, keeping track of it."""
+        backlog = self.queue.qsize()
+        if not backlog:
+            return
+        self.stats.carried_over(backlog)
+        self.log("unqueue: {} messages carried over, lanes {}",
+                 backlog, self.queue.depths())
+        if getattr(self.vim, "session", None):
+            self.wake_up()
+        else:
+            self.schedule_tick()
 
-    def unqueue_and_display(self, filename):
-        """Unqueue messages and give feedback to user (if necessary)."""
+    def schedule_tick(self):
+        """Have Vim unqueue again as soon as it's idle, with a timer.
+
+        Without timers, the backlog waits for the next ``CursorHold``, which
+        drains it entirely.
+        """
+        if not self.tick_scheduled and int(self.vim_eval("has_timers")):
+            self.tick_scheduled = True
+            self.vim_command("unqueue_timer")
+
+    def unqueue_and_display(self, filename, drain=False):
+        """Unqueue messages and give feedback to user (if necessary).
+
+        Messages are handled within the `unqueue_budget`, unless asked to
+        `drain` the queue.
+        """
         if self.running and self.ws:
             self.lazy_display_error(filename)
-            self.unqueue()
+            self.unqueue(budget=None if drain else self.unqueue_budget)
 
     def lazy_display_error(self, filename):
         """Display error when user is over it."""
-        error = self.get_error_at(self.cursor())
+        if not self.errors:
+            return
+        cursor = self.cursor()
+        error = self.get_error_at(self.path(), cursor)
         if error:
-            report = error.get_truncated_message(
-                self.cursor(), self.width() - 1)
+            report = error.get_truncated_message(cursor, self.width() - 1)
             self.raw_message(report)
 
     def on_cursor_hold(self, filename):
@@ -774,7 +1277,8 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
             # user interaction (CursorMove)
             self.setup(True, False)
             self.connection_attempts += 1
-        self.unqueue_and_display(filename)
+        # The user is idle, it's time to catch up with any backlog
+        self.unqueue_and_display(filename, drain=True)
         # Make sure any plugin overrides this
         self.vim_command("set_updatetime")
         # Keys with no effect, just retrigger CursorHold
@@ -793,47 +1297,179 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
         if success:
             self.message("start_message")
 
-    def get_error_at(self, cursor):
-        """Return error at position `cursor`."""
-        for error in self.errors:
-            if error.includes(self.vim.eval("expand('%:p')"), cursor):
-                return error
-        return None
+    def get_error_at(self, path, cursor):
+        """Return error at position `cursor` in the file at `path`."""
+        return self.errors.at(os.path.abspath(path), cursor)
 
     def complete_func(self, findstart, base):
         """Handle omni completion."""
-        def detect_row_column_start():
-            row, col = self.cursor()
-            start = col
-            line = self.vim.current.line
-            while start > 0 and line[start - 1] not in " .":
-                start -= 1
-            # Start should be 1 when startcol is zero
-            return row, col, start if start else 1
-
-        self.log("complete_func: in {} {}".format(findstart, base))
+        self.log("complete_func: in {} {}", findstart, base)
         if str(findstart) == "1":
-            row, col, startcol = detect_row_column_start()
+            return self.start_completion()
+        return self.finish_completion()
+
+    def start_completion(self):
+        """Return where the identifier to complete starts.
 
+        Its completions are requested, unless they are cached or on their
+        way, e.g. prefetched for a shorter prefix.
+        """
+        row, col = self.cursor()
+        line = self.vim.current.line
+        start = lexer.completion_start(line, col)
+        context = self.context_at(row, start, line, self.vim_eval("insert_tick"))
+        prefix = line[start:col]
+        self.completion_point = (row, col, context, prefix)
+        if not self.extends_requested(context, prefix):
+            self.cancel_completion()
+
+        # Same identifier as the previous completion, the cache may do
+        self.suggestions = None
+        if not self.completion_response:
+            self.suggestions = self.completion_cache.lookup(context, prefix)
+        if self.prefetch == context and (self.completion_response or
+                                         self.suggestions is not None):
+            self.stats.count("prefetch used")
+        self.prefetch = None
+        if self.suggestions is None and not self.completion_response:
             # Make request to get response ASAP
-            self.complete(row, col)
-            self.completion_started = True
+            self.request_completions(row, col, context, prefix)
+
+        # We always allow autocompletion, even with empty seeds
+        # Start should be 1 when startcol is zero
+        return start if start else 1
+
+    def finish_completion(self):
+        """Return the suggestions for the identifier being completed."""
+        # Only handle snd invocation if fst has already been done, in
+        # async mode the completions are shown when they arrive
+        if self.completion_response and not self.async_completion:
+            self.suggestions = self.wait_for_completions()
+        result = self.suggestions or []
+        self.log("complete_func: {} suggestions", len(result))
+        self.suggestions = None
+        return result
 
-            # We always allow autocompletion, even with empty seeds
-            return startcol
-        else:
-            result = []
-            # Only handle snd invocation if fst has already been done
-            if self.completion_started:
-                # Unqueing messages until we get suggestions
-                self.unqueue(timeout=self.completion_timeout, should_wait=True)
-                suggestions = self.suggestions or []
-                self.log("complete_func: suggests in {}".format(suggestions))
-                for m in suggestions:
-                    result.append(m)
-                self.suggestions = None
-                self.completion_started = False
-            return result
+    def wait_for_completions(self):
+        """Wait for the completions requested and filter them by the prefix.
+
+        If they were requested for a shorter prefix and some may have been
+        left out, they are requested again for the prefix.
+        """
+        row, col, context, prefix = self.completion_point
+        if not self.receive_completions(self.completion_timeout):
+            return None
+        suggestions = self.completion_cache.lookup(context, prefix)
+        if suggestions is None:
+            self.request_completions(row, col, context, prefix)
+            if self.receive_completions(self.completion_timeout):
+                suggestions = self.completion_cache.lookup(context, prefix)
+        return suggestions
+
+    def request_completions(self, row, col, context, prefix, max_results=None):
+        """Request the completions of `prefix` in `context`, at a position."""
+        max_results = max_results or self.completion_cache.max_results
+        self.completion_response = self.complete(row, col, max_results)
+        self.completion_context = (context, prefix, max_results)
+        if self.async_completion:
+            self.completion_response.add_done_callback(self.on_completion_done)
+
+    def extends_requested(self, context, prefix):
+        """Whether the completions requested last can do for `prefix`."""
+        if not self.completion_context:
+            return False
+        requested, requested_prefix, _ = self.completion_context
+        return context == requested and prefix.startswith(requested_prefix)
+
+    def context_at(self, row, start, line, insert_tick):
+        """The context of completions starting at `row` and `start` in `line`.
+
+        Completions are only reused in the same file, at the same place and
+        after the same text, and within an insert session: the buffer may have
+        been changed anywhere since the `changedtick` at which it started.
+        """
+        return (self.path(), int(insert_tick), row, start, line[:start])
+
+    def prefetch_completions(self, row, col, line, insert_tick):
+        """Request completions once a trigger is typed, before they're asked.
+
+        The cursor is at `row` and `col` in `line`, in the insert session
+        started at `insert_tick`. When the omnifunc is
+        called, the completions have been received or are at least on their
+        way. Prefetches made useless by a new request are cancelled.
+        """
+        if not line[:col].endswith(self.completion_triggers):
+            return
+        start = lexer.completion_start(line, col)
+        context = self.context_at(row, start, line, insert_tick)
+        if self.completion_cache.context == context or \
+                (self.completion_response and self.completion_context[0] == context):
+            return
+        self.cancel_completion()
+        # Everything matches right after a trigger, enough results are asked
+        # for them to do while the identifier is typed
+        self.request_completions(row, col, context, line[start:col],
+                                 self.prefetch_max_results)
+        self.prefetch = context
+        self.stats.count("prefetch sent")
+        self.log("prefetch_completions: {}", self.completion_response)
+
+    def cancel_completion(self):
+        """Cancel the ongoing completion request, if any."""
+        if self.completion_response:
+            # A prefetch that has already arrived is not cancelled, only unused
+            if self.completion_response.cancel() and self.prefetch:
+                self.stats.count("prefetch cancelled")
+            self.completion_response = None
+        self.prefetch = None
+
+    def receive_completions(self, timeout):
+        """Wait for the completions requested and cache them.
+
+        Returns whether they have been received.
+        """
+        response, self.completion_response = self.completion_response, None
+        # Wait for our completions only, other messages stay queued
+        if not self.handle_response(response, timeout):
+            return False
+        context, prefix, max_results = self.completion_context
+        self.completion_cache.store(context, prefix, self.completions or [],
+                                    max_results)
+        self.completions = None
+        return True
+
+    def on_completion_done(self, response):
+        """Have the completions shown by Neovim once they are received."""
+        if not response.cancelled():
+            self.vim.session.threadsafe_call(
+                lambda: self.show_completions(response))
+
+    def show_completions(self, response):
+        """Show the completions that arrived in the completion popup.
+
+        They are dropped if another completion has been requested meanwhile,
+        or if the user has left insert mode or the identifier being completed.
+        """
+        if response is not self.completion_response:
+            return
+        if not self.receive_completions(0) or self.prefetch:
+            # Prefetched completions are kept for the omnifunc
+            return
+
+        context = self.completion_context[0]
+        path, _, row, start, before = context
+        cursor_row, col = self.cursor()
+        line = self.vim.current.line
+        if self.vim_eval("mode") != "i" or cursor_row != row or col < start \
+                or line[:start] != before or self.path() != path:
+            self.log("show_completions: {} is stale", response)
+            return
+        matches = self.completion_cache.lookup(context, line[start:col])
+        if matches is None:
+            # Requested for a shorter prefix, some may have been left out
+            self.request_completions(row, col, context, line[start:col])
+        elif matches:
+            self.vim.call("complete", (start if start else 1) + 1, matches)
 
 
 class EnsimeClientV1(ProtocolHandlerV1, EnsimeClient):
@@ -856,7 +1492,7 @@ def execute_with_client(quiet=False,
                 bootstrap_server=bootstrap_server,
                 create_client=create_client)
             if client and client.running:
-                return f(self, client, *args, **kwargs)
+                return client.profiled(f, self, client, *args, **kwargs)
         return wrapper2
 
     return wrapper
@@ -874,9 +1510,7 @@ class Ensime(object):
         self.server_v2 = bool(self.get_setting('server_v2', 0))
 
     def get_setting(self, key, default):
-        gkey = "g:ensime_{}".format(key)
-        key_exists = int(self.vim.eval("exists('{}')".format(gkey))) 
-        return self.vim.eval(gkey) if key_exists else default
+        return get_setting(self.vim, key, default)
 
     def init_integrations(self):
         syntastic_runtime = os.path.abspath(
@@ -889,6 +1523,21 @@ class Ensime(object):
     def client_keys(self):
         return self.clients.keys()
 
+    def on_buf_lines_event(self, buf, changedtick, firstline, lastline,
+                           linedata, more=False):
+        """Changes of a buffer attached by a client, sent by Neovim."""
+        for c in self.clients.values():
+            c.on_buffer_lines(buf.number, changedtick, firstline, lastline,
+                              linedata)
+
+    def on_buf_changedtick_event(self, buf, changedtick):
+        for c in self.clients.values():
+            c.on_buffer_changedtick(buf.number, changedtick)
+
+    def on_buf_detach_event(self, buf):
+        for c in self.clients.values():
+            c.on_buffer_detach(buf.number)
+
     def client_status(self, config_path):
         """Get the client status of a given project."""
         c = self.client_for(config_path)
@@ -979,6 +1628,10 @@ class Ensime(object):
     def com_en_toggle_fulltype(self, client, args, range=None):
         client.toggle_fulltype(None)
 
+    @execute_with_client()
+    def com_en_stats(self, client, args, range=None):
+        client.show_stats(args, range)
+
     @execute_with_client()
     def com_en_format_source(self, client, args, range=None):
         client.format_source(None)
@@ -1093,11 +1746,22 @@ class Ensime(object):
     def au_cursor_moved(self, client, filename):
         client.on_cursor_move(filename)
 
+    @execute_with_client(quiet=True, create_client=False)
+    def on_unqueue_timer(self, client):
+        client.on_wake_up()
+
+    @execute_with_client(quiet=True, create_client=False)
+    def fun_en_prefetch_completions(self, client, *args):
+        """Invokable function from vim and neovim to prefetch completions."""
+        # Neovim passes the arguments as a list
+        row, col, line, insert_tick = args[0] if len(args) == 1 else args
+        client.prefetch_completions(int(row), int(col), line, insert_tick)
+
     @execute_with_client()
     def fun_en_complete_func(self, client, findstart_and_base, base=None):
         """Invokable function from vim and neovim to perform completion."""
         if self.is_scala_file() or self.is_java_file():
-            client.log("{} {}".format(findstart_and_base, base))
+            client.log("{} {}", findstart_and_base, base)
             if not (isinstance(findstart_and_base, list)):
                 # Invoked by vim
                 findstart = findstart_and_base
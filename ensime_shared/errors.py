@@ -1,6 +1,7 @@
 # coding: utf-8
 
 import os
+from bisect import bisect_right
 
 
 class InvalidJavaPathError(OSError):
@@ -10,6 +11,43 @@ class InvalidJavaPathError(OSError):
         super(InvalidJavaPathError, self).__init__(errno, msg, filename, *args)
 
 
+class CallTimeoutError(Exception):
+    """Raised when the response to a request doesn't arrive in time."""
+
+    def __init__(self, call_id, typehint, timeout):
+        msg = "no response to {} (callId {}) within {}s".format(typehint, call_id, timeout)
+        super(CallTimeoutError, self).__init__(msg)
+        self.call_id = call_id
+
+
+class CallCancelledError(Exception):
+    """Raised when waiting for the response to a cancelled request."""
+
+    def __init__(self, call_id, typehint):
+        msg = "request {} (callId {}) was cancelled".format(typehint, call_id)
+        super(CallCancelledError, self).__init__(msg)
+        self.call_id = call_id
+
+
+class ConnectionLostError(Exception):
+    """Raised for a request in flight when the connection is lost."""
+
+    def __init__(self, call_id, typehint):
+        msg = "connection lost before the response to {} (callId {})".format(
+            typehint, call_id)
+        super(ConnectionLostError, self).__init__(msg)
+        self.call_id = call_id
+
+
+class SendQueueFullError(Exception):
+    """Raised when too many requests are already waiting to be sent."""
+
+    def __init__(self, size):
+        msg = "{} requests are already waiting to be sent".format(size)
+        super(SendQueueFullError, self).__init__(msg)
+        self.size = size
+
+
 class Error(object):
     """Represents an error in source code reported by ENSIME."""
 
@@ -41,3 +79,44 @@ class Error(object):
             end = size
             start = size - width
         return self.message[start:end]
+
+
+class ErrorIndex(object):
+    """Errors by file and line, to find the one at a position quickly.
+
+    The errors of a line are sorted by beginning column. When errors
+    overlap, the one beginning last is found, i.e. the innermost.
+    """
+
+    def __init__(self):
+        # Absolute path -> line -> (beginning columns, errors)
+        self.files = {}
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for lines in self.files.values():
+            for _, errors in lines.values():
+                for error in errors:
+                    yield error
+
+    def add(self, error):
+        lines = self.files.setdefault(error.path, {})
+        starts, errors = lines.setdefault(error.l, ([], []))
+        i = bisect_right(starts, error.c)
+        starts.insert(i, error.c)
+        errors.insert(i, error)
+        self.count += 1
+
+    def at(self, path, cursor):
+        """Return the error at `cursor` in the file at absolute `path`."""
+        line = self.files.get(path, {}).get(cursor[0])
+        if not line:
+            return None
+        starts, errors = line
+        for i in range(bisect_right(starts, cursor[1]) - 1, -1, -1):
+            if cursor[1] < errors[i].e:
+                return errors[i]
+        return None
@@ -0,0 +1,144 @@
+# coding: utf-8
+
+"""
+Futures for the responses to requests sent to the ENSIME server.
+"""
+
+import threading
+import time
+
+from ensime_shared.errors import CallCancelledError, CallTimeoutError
+
+PENDING = "pending"
+CANCELLED = "cancelled"
+FINISHED = "finished"
+
+
+class ResponseFuture(object):
+    """The eventual response to a request, correlated by its `callId`.
+
+    Futures are resolved by the thread receiving messages from the server, so
+    done-callbacks run in that thread too unless the future is already done
+    when they are added. They must not call into Vim.
+
+    A future is `claimed` when its response is consumed by whoever holds it
+    instead of being queued for the regular handlers.
+    """
+
+    def __init__(self, call_id, request, claimed=False):
+        self.call_id = call_id
+        self.typehint = request.get("typehint")
+        self.claimed = claimed
+        self.queued_at = time.time()
+        self.sent_at = None
+        self.received_at = None
+        # Serialized request, kept to replay it after reconnecting
+        self.message = None
+        self._condition = threading.Condition()
+        self._state = PENDING
+        self._payload = None
+        self._exception = None
+        self._callbacks = []
+
+    def __repr__(self):
+        return "<ResponseFuture {} {} {}>".format(
+            self.call_id, self.typehint, self._state)
+
+    def done(self):
+        """Whether the future has been resolved or cancelled."""
+        return self._state != PENDING
+
+    def cancelled(self):
+        return self._state == CANCELLED
+
+    def cancel(self):
+        """Cancel the future, a late response will be dropped.
+
+        Returns False if the future was already done.
+        """
+        return self._resolve(CANCELLED, None, None)
+
+    def set_result(self, payload):
+        """Resolve the future with a response `payload`.
+
+        Returns False if the future was already done, e.g. cancelled.
+        """
+        return self._resolve(FINISHED, payload, None)
+
+    def set_exception(self, exception):
+        """Fail the future, `exception` will be raised to waiters."""
+        return self._resolve(FINISHED, None, exception)
+
+    def result(self, timeout=None):
+        """Wait up to `timeout` seconds for the response payload.
+
+        Raises ``CallTimeoutError`` if it doesn't arrive in time, or
+        ``CallCancelledError`` if the future has been cancelled.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while self._state == PENDING:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    raise CallTimeoutError(self.call_id, self.typehint, timeout)
+                self._condition.wait(remaining)
+
+        if self._state == CANCELLED:
+            raise CallCancelledError(self.call_id, self.typehint)
+        if self._exception:
+            raise self._exception
+        return self._payload
+
+    def add_done_callback(self, fn):
+        """Call `fn` with this future once it's done.
+
+        If it's already done, `fn` is called right away in this thread.
+        """
+        with self._condition:
+            if self._state == PENDING:
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    def _resolve(self, state, payload, exception):
+        with self._condition:
+            if self._state != PENDING:
+                return False
+            self._state = state
+            self._payload = payload
+            self._exception = exception
+            self._condition.notify_all()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for fn in callbacks:
+            fn(self)
+        return True
+
+
+class PendingCalls(object):
+    """Thread-safe registry of the requests still awaiting a response."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def __len__(self):
+        return len(self._calls)
+
+    def add(self, future):
+        with self._lock:
+            self._calls[future.call_id] = future
+
+    def get(self, call_id):
+        return self._calls.get(call_id)
+
+    def pop(self, call_id):
+        """Remove and return the future for `call_id`, if any."""
+        with self._lock:
+            return self._calls.pop(call_id, None)
+
+    def outstanding(self):
+        """Futures of the requests still awaiting a response, oldest first."""
+        with self._lock:
+            calls = list(self._calls.values())
+        return sorted(calls, key=lambda f: f.call_id)
@@ -0,0 +1,98 @@
+# coding: utf-8
+
+"""
+Prioritized queue of the messages received from the ENSIME server.
+"""
+
+import sys
+import threading
+from collections import deque
+
+# Queue depends on python version
+if sys.version_info > (3, 0):
+    from queue import Empty
+else:
+    from Queue import Empty
+
+RESPONSES, EVENTS, BULK = range(3)
+"""Lanes, by decreasing priority."""
+
+BULK_EVENTS = frozenset([
+    "ClearAllScalaNotesEvent",
+    "ClearAllJavaNotesEvent",
+    "DebugOutputEvent",
+    # Completes the notes, so it must not overtake them
+    "FullTypeCheckCompleteEvent",
+    "NewJavaNotesEvent",
+    "NewScalaNotesEvent",
+    "SendBackgroundMessageEvent",
+])
+"""Events that can come in floods and that nobody is waiting for."""
+
+
+def lane_of(message):
+    """Classify a decoded message in a lane.
+
+    Responses to requests go first, then events like the analyzer or indexer
+    being ready, and finally notes and debug output.
+    """
+    if message.get("callId") is not None:
+        return RESPONSES
+    payload = message.get("payload") or {}
+    return BULK if payload.get("typehint") in BULK_EVENTS else EVENTS
+
+
+class PriorityInbox(object):
+    """Thread-safe queue of messages served by lane priority.
+
+    Messages are FIFO within a lane. To prevent starvation, a lane gets one
+    message served after `weight` messages of higher lanes have been served
+    while it was waiting, so that a flood of notes keeps progressing without
+    overtaking the responses. Implements the subset of the ``Queue``
+    interface used by ``EnsimeClient``.
+    """
+
+    def __init__(self, weight=8):
+        self.weight = weight
+        self._condition = threading.Condition()
+        self._lanes = [deque() for _ in (RESPONSES, EVENTS, BULK)]
+        # Messages of higher lanes served while each lane was waiting
+        self._passed = [0 for _ in (RESPONSES, EVENTS, BULK)]
+
+    def qsize(self):
+        return sum(len(lane) for lane in self._lanes)
+
+    def empty(self):
+        return not self.qsize()
+
+    def depths(self):
+        """Number of messages waiting in each lane."""
+        return [len(lane) for lane in self._lanes]
+
+    def put(self, message):
+        with self._condition:
+            self._lanes[lane_of(message)].append(message)
+            self._condition.notify()
+
+    def get(self, block=True, timeout=None):
+        """Remove and return the next message to handle.
+
+        Raises ``Empty`` if there is none, after waiting up to `timeout`
+        seconds if `block` is set.
+        """
+        with self._condition:
+            if block and self.empty():
+                self._condition.wait(timeout)
+            if self.empty():
+                raise Empty()
+            return self._lanes[self._next_lane()].popleft()
+
+    def _next_lane(self):
+        waiting = [i for i in (RESPONSES, EVENTS, BULK) if self._lanes[i]]
+        served = next((i for i in waiting[1:] if self._passed[i] >= self.weight),
+                      waiting[0])
+        for i in waiting:
+            if i > served:
+                self._passed[i] += 1
+        self._passed[served] = 0
+        return served
@@ -0,0 +1,184 @@
+# coding: utf-8
+
+"""
+Lexical scanning of Scala and Java source lines.
+
+Only what the editor needs is recognized: identifiers, including operators,
+backquoted and unicode ones, and package clauses. String and character
+literals and line comments are skipped so that their contents aren't taken
+for identifiers. Columns are indexes in the line as given, i.e. bytes for the
+byte strings of Python 2 and characters otherwise.
+"""
+
+import re
+import unicodedata
+
+OPERATOR_CHARS = frozenset("!#%&*+-/:<=>?@\\^|~")
+
+_PACKAGE = re.compile(r"package\s+([\w$.`]+)\s*[;{]?\s*$")
+
+
+def is_letter(ch):
+    """Whether `ch` can be part of an alphanumeric identifier."""
+    if ord(ch) < 0x80:
+        return ch.isalnum() or ch in "_$"
+    if isinstance(ch, bytes):
+        # Byte of a multi-byte UTF-8 character, most likely a letter
+        return True
+    return unicodedata.category(ch)[0] in "LN"
+
+
+def is_operator(ch):
+    """Whether `ch` can be part of an operator identifier."""
+    if ord(ch) < 0x80 or isinstance(ch, bytes):
+        return ch in OPERATOR_CHARS
+    return unicodedata.category(ch) in ("Sm", "So")
+
+
+def identifiers(line):
+    """Iterate over the ``(start, end)`` spans of the identifiers of a line.
+
+    The end is excluded. A backquoted identifier spans its backquotes, and
+    one left open spans the rest of the line. Keywords are identifiers too.
+    """
+    i, n = 0, len(line)
+    while i < n:
+        ch = line[i]
+        if ch == "`":
+            end = _scan_backquoted(line, i)
+        elif is_letter(ch) and not ch.isdigit():
+            end = _scan_alnum(line, i)
+        elif is_operator(ch) and not line.startswith(("//", "/*"), i):
+            end = _scan_operator(line, i)
+        else:
+            i = _skip(line, i)
+            if i is None:
+                return
+            continue
+        yield i, end
+        i = end
+
+
+def identifier_span(line, col):
+    """Return the span of the identifier at `col` in `line`, or None."""
+    for start, end in identifiers(line):
+        if start > col:
+            break
+        if col < end:
+            return start, end
+    return None
+
+
+def completion_start(line, col):
+    """Return the column where the identifier being typed before `col` starts.
+
+    It's `col` itself if there is none, e.g. right after a dot.
+    """
+    start = col
+    for s, e in identifiers(line[:col]):
+        start = s if e == col else col
+    return start
+
+
+def package_clauses(lines):
+    """Return the names of the package clauses at the top of a source file.
+
+    Scanning stops at the first line that is not a package clause, a blank
+    line or a comment. Package objects are not clauses.
+    """
+    clauses = []
+    in_comment = False
+    for line in lines:
+        if in_comment:
+            in_comment = "*/" not in line
+            continue
+        line = line.split("//")[0].strip()
+        if not line:
+            continue
+        if line.startswith("/*"):
+            in_comment = "*/" not in line
+            continue
+
+        match = _PACKAGE.match(line)
+        if not match or match.group(1) == "object":
+            break
+        clauses.append(match.group(1))
+    return clauses
+
+
+def _scan_backquoted(line, i):
+    """Return the end of the backquoted identifier starting at `i`."""
+    end = line.find("`", i + 1)
+    return len(line) if end < 0 else end + 1
+
+
+def _scan_alnum(line, i):
+    """Return the end of the alphanumeric identifier starting at `i`."""
+    end, n = i + 1, len(line)
+    while end < n and is_letter(line[end]):
+        end += 1
+    # Like `unary_!`
+    if line[end - 1] == "_":
+        while end < n and is_operator(line[end]):
+            end += 1
+    return end
+
+
+def _scan_operator(line, i):
+    """Return the end of the operator identifier starting at `i`."""
+    end, n = i + 1, len(line)
+    while end < n and is_operator(line[end]) \
+            and not line.startswith(("//", "/*"), end):
+        end += 1
+    return end
+
+
+def _skip(line, i):
+    """Return the index after what isn't an identifier at `i`.
+
+    That is a literal, a number or any other character. None is returned if
+    the rest of the line is a comment.
+    """
+    ch = line[i]
+    if ch == '"':
+        return _skip_string(line, i)
+    if ch == "'":
+        return _char_literal_end(line, i) or i + 1
+    if line.startswith("/*", i):
+        # A block comment is only skipped if it ends on the same line
+        end = line.find("*/", i + 2)
+        return None if end < 0 else end + 2
+    if line.startswith("//", i):
+        return None
+    i += 1
+    if ch.isdigit():
+        while i < len(line) and is_letter(line[i]):
+            i += 1
+    return i
+
+
+def _skip_string(line, i):
+    """Return the index after the string literal starting at `i`."""
+    if line.startswith('"""', i):
+        end = line.find('"""', i + 3)
+        return len(line) if end < 0 else end + 3
+    j = i + 1
+    while j < len(line):
+        if line[j] == "\\":
+            j += 2
+            continue
+        if line[j] == '"':
+            return j + 1
+        j += 1
+    return len(line)
+
+
+def _char_literal_end(line, i):
+    """Return the index after the character literal starting at `i`, if any.
+
+    A quote can also start a symbol literal like 'name, or be unbalanced.
+    """
+    if line[i + 1:i + 2] == "\\":
+        end = line.find("'", i + 3)
+        return end + 1 if end > 0 else None
+    return i + 3 if line[i + 2:i + 3] == "'" else None
@@ -0,0 +1,165 @@
+# coding: utf-8
+
+"""
+Logging of the plugin activity in the background.
+
+Records are buffered and written by a dedicated thread, so that logging never
+blocks the editor on disk I/O. Messages are formatted in that thread too, only
+for the enabled levels.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+
+LEVELS = {
+    "debug": DEBUG,
+    "info": INFO,
+    "warning": WARNING,
+    "error": ERROR,
+}
+
+FORMAT = "%(asctime)s.%(msecs)03d %(levelname)s %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class LazyMessage(object):
+    """Message formatted with `str.format` only when it is written."""
+
+    def __init__(self, what, args):
+        self.what = what
+        self.args = args
+
+    def __str__(self):
+        try:
+            return self.what.format(*self.args)
+        except Exception as e:
+            return "{!r} {!r}: {}".format(self.what, self.args, e)
+
+
+class Logger(object):
+    """Levelled logger writing to a file rotated by size.
+
+    Calling the logger logs a debug message. Messages are either logged as is
+    or, if arguments are given, are format strings interpolated lazily::
+
+        self.log("send: {}", msg)
+
+    At most `capacity` records wait to be written, further ones are dropped
+    and counted in `dropped` so that a stalled disk never grows the memory.
+    """
+
+    def __init__(self, path, level=INFO, max_bytes=2 * 1024 * 1024,
+                 backups=3, capacity=10000):
+        self.path = path
+        self.level = level
+        self.capacity = capacity
+        self.dropped = 0
+        self.handler = RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, delay=True)
+        self.handler.setFormatter(logging.Formatter(FORMAT, DATE_FORMAT))
+        self._condition = threading.Condition()
+        self._records = deque()
+        self._writing = False
+        self._closed = False
+
+        self._writer = threading.Thread(target=self._write)
+        self._writer.daemon = True
+        self._writer.start()
+        atexit.register(self.close)
+
+    def set_level(self, name):
+        """Set the minimum level logged, by name. Unknown names are ignored."""
+        self.level = LEVELS.get(str(name).lower(), self.level)
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def debug(self, what, *args):
+        if DEBUG >= self.level:
+            self._push(DEBUG, what, args)
+
+    __call__ = debug
+
+    def info(self, what, *args):
+        if INFO >= self.level:
+            self._push(INFO, what, args)
+
+    def warning(self, what, *args):
+        if WARNING >= self.level:
+            self._push(WARNING, what, args)
+
+    def error(self, what, *args):
+        if ERROR >= self.level:
+            self._push(ERROR, what, args)
+
+    def flush(self, timeout=1):
+        """Wait up to `timeout` seconds for the buffered records to be written."""
+        deadline = time.time() + timeout
+        with self._condition:
+            while (self._records or self._writing) and not self._closed:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+    def close(self):
+        """Write the buffered records and stop the writer."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._writer.join(1)
+        self.handler.close()
+
+    def _push(self, level, what, args):
+        with self._condition:
+            if self._closed:
+                return
+            if len(self._records) >= self.capacity:
+                self.dropped += 1
+                return
+            self._records.append((time.time(), level, what, args))
+            self._condition.notify_all()
+
+    def _write(self):
+        while True:
+            with self._condition:
+                while not self._records and not self._closed:
+                    self._condition.wait()
+                records, self._records = self._records, deque()
+                dropped, self.dropped = self.dropped, 0
+                closed = self._closed
+                self._writing = True
+
+            if dropped:
+                records.append((time.time(), WARNING,
+                                "logger: {} records dropped", (dropped,)))
+            for created, level, what, args in records:
+                self.handler.handle(self._record(created, level, what, args))
+            self.handler.flush()
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+            if closed:
+                return
+
+    @staticmethod
+    def _record(created, level, what, args):
+        return logging.makeLogRecord({
+            "name": "ensime",
+            "levelno": level,
+            "levelname": logging.getLevelName(level),
+            "msg": LazyMessage(what, args) if args else what,
+            "created": created,
+            "msecs": (created - int(created)) * 1000,
+        })
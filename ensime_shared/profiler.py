@@ -0,0 +1,69 @@
+# coding: utf-8
+
+"""
+Opt-in profiling of the plugin entry points and response handlers.
+"""
+
+import cProfile
+import os
+import pstats
+import time
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+
+class Profiler(object):
+    """Collects ``cProfile`` statistics over a session.
+
+    Only the outermost profiled call enables the collector, so entry points
+    calling handlers are profiled once. Calls are expected to come from the
+    editor's thread.
+
+    The statistics are dumped to `directory` as ``<name>.prof``, to be read
+    with ``pstats`` or any compatible viewer, along with a summary of the
+    hottest functions in ``<name>.txt``.
+    """
+
+    def __init__(self, directory, top=40):
+        self.top = top
+        self.calls = 0
+        self.profile = cProfile.Profile()
+        session = time.strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(directory, "ensime-vim-{}".format(session))
+        self._depth = 0
+
+    def run(self, fn, *args, **kwargs):
+        """Call `fn`, profiling it unless a profiled call is running."""
+        if self._depth:
+            return fn(*args, **kwargs)
+
+        self._depth += 1
+        self.calls += 1
+        self.profile.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.profile.disable()
+            self._depth -= 1
+
+    def summary(self):
+        """The hottest functions, by cumulative and by own time."""
+        out = StringIO()
+        stats = pstats.Stats(self.profile, stream=out)
+        out.write("{} profiled calls\n".format(self.calls))
+        stats.sort_stats("cumulative").print_stats(self.top)
+        stats.sort_stats("tottime").print_stats(self.top)
+        return out.getvalue()
+
+    def dump(self):
+        """Write the statistics collected so far, returns the summary path."""
+        if not self.calls:
+            return None
+        self.profile.dump_stats(self.path + ".prof")
+        summary_path = self.path + ".txt"
+        with open(summary_path, "w") as f:
+            f.write(self.summary())
+        return summary_path
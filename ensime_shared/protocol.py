@@ -5,7 +5,6 @@ import json
 
 from ensime_shared.config import gconfig, feedback, commands
 from ensime_shared.util import catch
-from ensime_shared.symbol_format import completion_to_suggest
 
 class ProtocolHandler(object):
     """Mixin for common behavior of handling ENSIME protocol responses.
@@ -42,9 +41,13 @@ class ProtocolHandler(object):
         self.handlers["ImportSuggestions"] = self.handle_import_suggestions
         self.handlers["PackageInfo"] = self.handle_package_info
 
+    def handles(self, typehint):
+        """Whether responses of type `typehint` are of any use right now."""
+        return typehint in self.handlers
+
     def handle_incoming_response(self, call_id, payload):
         """Get a registered handler for a given response and execute it."""
-        self.log("handle_incoming_response: in {}".format(payload))
+        self.log("handle_incoming_response: in {}", payload)
         typehint = payload["typehint"]
         handler = self.handlers.get(typehint)
         def feature_not_supported(m):
@@ -54,7 +57,7 @@ class ProtocolHandler(object):
             with catch(NotImplementedError, feature_not_supported):
                 handler(call_id, payload)
         else:
-            self.log(feedback["unhandled_response"].format(payload))
+            self.log.warning(feedback["unhandled_response"], payload)
 
     def handle_indexer_ready(self, call_id, payload):
         raise NotImplementedError()
@@ -83,6 +86,9 @@ class ProtocolHandler(object):
     def handle_doc_uri(self, call_id, payload):
         raise NotImplementedError()
 
+    def handle_formatted_source(self, call_id, payload):
+        raise NotImplementedError()
+
     def handle_completion_info_list(self, call_id, payload):
         raise NotImplementedError()
 
@@ -118,38 +124,38 @@ class ProtocolHandlerV1(ProtocolHandler):
             self.vim.command(commands['display_message'].format("No import suggestions found"))
 
     def handle_package_info(self, call_id, payload):
-        package = payload["fullName"]
-        # Create a new buffer 45 columns wide
-        def add(member, indentLevel):
-            indent = "  " * indentLevel
-            t = member["declAs"]["typehint"] if member["typehint"] == "BasicTypeInfo" else ""
-            line = "{}{}: {}".format(indent, t, member["name"])
-            self.vim.command(commands["append_line"].format("\'$\'", str(line)))
-            if indentLevel < 4:
-                for m in member["members"]:
-                    add(m, indentLevel + 1)
+        """Handler for response `PackageInfo`, rendered progressively."""
+        def lines():
+            yield str(payload["fullName"])
+            # Depth-first, without recursion
+            stack = [(m, 1) for m in reversed(payload["members"])]
+            while stack:
+                member, indentLevel = stack.pop()
+                indent = "  " * indentLevel
+                t = member["declAs"]["typehint"] if member["typehint"] == "BasicTypeInfo" else ""
+                yield str("{}{}: {}".format(indent, t, member["name"]))
+                if indentLevel < 4:
+                    stack.extend((m, indentLevel + 1) for m in reversed(member["members"]))
 
+        # Create a new buffer 45 columns wide
         cmd = commands["new_vertical_scratch"].format(str(45),"package_info")
         self.vim.command(cmd)
         self.vim.command(commands["set_filetype"].format("package_info"))
-        self.vim.command(commands["append_line"].format("\'$\'", str(package)))
-        for member in payload["members"]:
-            add(member, 1)
+        self.append_lines(lines())
 
     def handle_symbol_search(self, call_id, payload):
         """Handler for symbol search results"""
-        self.log(payload)
-        syms = payload["syms"]
-        qfList = []
-        for sym in syms:
-            p = sym.get("pos")
-            if p:
-                item = self.to_quickfix_item(str(p["file"]),
-                                            p["line"],
-                                            str(sym["name"]),
-                                            "info")
-                qfList.append(item)
-        self.write_quickfix_list(qfList)
+        self.log("{}", payload)
+        def items():
+            for sym in payload["syms"]:
+                p = sym.get("pos")
+                if p:
+                    yield self.to_quickfix_item(str(p["file"]),
+                                                p["line"],
+                                                str(sym["name"]),
+                                                "info")
+
+        self.write_quickfix_list(items())
 
     def handle_symbol_info(self, call_id, payload):
         """Handler for response `SymbolInfo`."""
@@ -157,7 +163,7 @@ class ProtocolHandlerV1(ProtocolHandler):
         with catch(KeyError, warn):
             decl_pos = payload["declPos"]
             f = decl_pos.get("file")
-            self.log(str(self.call_options[call_id]))
+            self.log("{}", self.call_options[call_id])
             display = self.call_options[call_id].get("display")
             if display and f:
                 self.vim.command(commands["display_message"].format(f))
@@ -184,47 +190,47 @@ class ProtocolHandlerV1(ProtocolHandler):
         This is the response for the following requests:
           1. `DocUriAtPointReq` or `DocUriForSymbolReq`
           2. `DebugToStringReq`
-          3. `FormatOneSourceReq`
+
+        `FormatOneSourceReq` waits for its own response instead, handled by
+        ``handle_formatted_source``.
         """
-        self.log(str(payload))
+        self.log("{}", payload)
         self.handle_doc_uri(call_id, payload)
 
     def handle_doc_uri(self, call_id, payload):
         """Handler for responses of Doc URIs."""
-        if not self.en_format_source_id:
-            self.log("handle_string_response: received doc path")
-            port = self.ensime.http_port()
+        self.log("handle_string_response: received doc path")
+        port = self.ensime.http_port()
 
-            url = payload["text"]
+        url = payload["text"]
 
-            if not url.startswith("http"):
-                url = gconfig["localhost"].format(port, payload["text"])
+        if not url.startswith("http"):
+            url = gconfig["localhost"].format(port, payload["text"])
 
-            browse_enabled = self.call_options[call_id].get("browse")
+        browse_enabled = self.call_options[call_id].get("browse")
 
-            if browse_enabled:
-                log_msg = "handle_string_response: browsing doc path {}"
-                self.log(log_msg.format(url))
-                try:
-                    if webbrowser.open(url):
-                        self.log("opened {}".format(url))
-                except webbrowser.Error as e:
-                    log_msg = "handle_string_response: webbrowser error: {}"
-                    self.log(log_msg.format(e))
-                    self.raw_message(feedback["manual_doc"].format(url))
+        if browse_enabled:
+            log_msg = "handle_string_response: browsing doc path {}"
+            self.log(log_msg, url)
+            try:
+                if webbrowser.open(url):
+                    self.log("opened {}", url)
+            except webbrowser.Error as e:
+                log_msg = "handle_string_response: webbrowser error: {}"
+                self.log.warning(log_msg, e)
+                self.raw_message(feedback["manual_doc"].format(url))
 
-            del self.call_options[call_id]
-        else:
-            self.vim.current.buffer[:] = \
-                [line.encode('utf-8') for line in payload["text"].split("\n")]
-            self.en_format_source_id = None
+        del self.call_options[call_id]
+
+    def handle_formatted_source(self, call_id, payload):
+        """Handler for the `StringResponse` to a `FormatOneSourceReq`."""
+        self.vim.current.buffer[:] = \
+            [line.encode('utf-8') for line in payload["text"].split("\n")]
 
     def handle_completion_info_list(self, call_id, payload):
         """Handler for a completion response."""
-        completions = payload["completions"]
-        self.log("handle_completion_info_list: in")
-        self.suggestions = [completion_to_suggest(c) for c in completions]
-        self.log("handle_completion_info_list: {}".format(self.suggestions))
+        self.completions = payload["completions"]
+        self.log("handle_completion_info_list: {} completions", len(self.completions))
 
     def handle_type_inspect(self, call_id, payload):
         """Handler for responses `TypeInspectInfo`."""
@@ -242,7 +248,7 @@ class ProtocolHandlerV1(ProtocolHandler):
         else:
             tpe = payload['name']
 
-        self.log(feedback["displayed_type"].format(tpe))
+        self.log(feedback["displayed_type"], tpe)
         self.raw_message(tpe)
 
 
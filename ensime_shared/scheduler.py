@@ -0,0 +1,104 @@
+# coding: utf-8
+
+"""
+Scheduling of the requests sent to the ENSIME server.
+"""
+
+import threading
+
+from ensime_shared.errors import SendQueueFullError
+
+SUPERSEDABLE = frozenset([
+    "CompletionsReq",
+    "InspectTypeAtPointReq",
+    "SymbolAtPointReq",
+    "TypeAtPointReq",
+])
+"""Cursor-driven requests for which only the latest one matters."""
+
+REPLAYABLE = frozenset([
+    "CompletionsReq",
+    "ConnectionInfoReq",
+    "DebugBacktraceReq",
+    "DocUriAtPointReq",
+    "FormatOneSourceReq",
+    "ImportSuggestionsReq",
+    "InspectPackageByPathReq",
+    "InspectTypeAtPointReq",
+    "PublicSymbolSearchReq",
+    "SymbolAtPointReq",
+    "SymbolByNameReq",
+    "TypeAtPointReq",
+])
+"""Read-only requests that can safely be sent again after reconnecting."""
+
+
+class RequestScheduler(object):
+    """Queue of the requests waiting to be sent, in order.
+
+    A request of a `SUPERSEDABLE` kind supersedes the older ones of the same
+    kind: one still waiting to be sent is coalesced into it, and one in flight
+    is reported so that its late response can be dropped.
+
+    At most `max_queued` requests can wait to be sent, further submissions
+    are rejected so that callers never block on a stalled connection.
+
+    Entries are ``(future, message)`` pairs, where `message` is the
+    serialized request and `future` its ``ResponseFuture``.
+    """
+
+    def __init__(self, max_queued=100):
+        self._condition = threading.Condition()
+        self._queued = []
+        self._latest = {}
+        self.max_queued = max_queued
+        self.coalesced = 0
+        self.superseded = 0
+        self.rejected = 0
+
+    def __len__(self):
+        return len(self._queued)
+
+    def submit(self, future, message):
+        """Queue a request to be sent.
+
+        Returns a pair of lists of the futures it supersedes: the ones that
+        were still queued, and the ones in flight. Raises
+        ``SendQueueFullError`` if there is no room left for it.
+        """
+        kind = future.typehint
+        coalesced, superseded = [], []
+        with self._condition:
+            if kind in SUPERSEDABLE:
+                coalesced = [f for f, _ in self._queued if f.typehint == kind]
+            if not coalesced and len(self._queued) >= self.max_queued:
+                self.rejected += 1
+                raise SendQueueFullError(len(self._queued))
+
+            if kind in SUPERSEDABLE:
+                self._queued = [e for e in self._queued if e[0].typehint != kind]
+                older = self._latest.get(kind)
+                if older and older not in coalesced and not older.done():
+                    superseded.append(older)
+                self._latest[kind] = future
+                self.coalesced += len(coalesced)
+                self.superseded += len(superseded)
+            self._queued.append((future, message))
+            self._condition.notify()
+        return coalesced, superseded
+
+    def requeue(self, entries):
+        """Put entries back in front of the queue, e.g. to replay them."""
+        with self._condition:
+            self._queued[0:0] = entries
+            self._condition.notify()
+
+    def next(self, timeout=None):
+        """Pop the next entry to be sent, waiting up to `timeout` seconds.
+
+        Returns None if there isn't any.
+        """
+        with self._condition:
+            if not self._queued:
+                self._condition.wait(timeout)
+            return self._queued.pop(0) if self._queued else None
@@ -0,0 +1,55 @@
+Feature: Cache completion suggestions
+  In order not to ask the server again for each character typed
+  We need to filter and rank its previous suggestions locally
+
+  Scenario Outline: Rank cached suggestions
+    Given Cached suggestions for prefix "m":
+      | word       |
+      | maxBy      |
+      | map        |
+      | mapValues  |
+      | makeString |
+      | MAX_VALUE  |
+    When We complete the prefix "<prefix>" in the same context
+    Then We get the suggestions <suggestions>
+
+  Examples:
+    | prefix | suggestions                                     |
+    | m      | maxBy, map, mapValues, makeString, MAX_VALUE    |
+    | map    | map, mapValues                                  |
+    | mapV   | mapValues                                       |
+    | maX    | maxBy, MAX_VALUE                                |
+    | mS     | makeString, mapValues                           |
+    | mV     | mapValues, MAX_VALUE                            |
+
+  Scenario: Another context needs a request
+    Given Cached suggestions for prefix "ma":
+      | word |
+      | map  |
+    When We complete the prefix "ma" in another context
+    Then We need to ask the server
+
+  Scenario: A shorter prefix needs a request
+    Given Cached suggestions for prefix "ma":
+      | word |
+      | map  |
+    When We complete the prefix "m" in the same context
+    Then We need to ask the server
+
+  Scenario: Truncated suggestions need a request for a longer prefix
+    Given At most 2 suggestions are requested
+    And Cached suggestions for prefix "ma":
+      | word |
+      | map  |
+      | max  |
+    When We complete the prefix "map" in the same context
+    Then We need to ask the server
+
+  Scenario: Suggestions requested with more results are not truncated
+    Given At most 2 suggestions are requested
+    And Cached suggestions for prefix "ma" out of at most 1000:
+      | word |
+      | map  |
+      | max  |
+    When We complete the prefix "map" in the same context
+    Then We get the suggestions map
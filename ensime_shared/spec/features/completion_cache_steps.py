@@ -0,0 +1,38 @@
+from lettuce import *
+from ensime_shared.completion import CompletionCache
+from unittest import TestCase
+
+tc = TestCase("__init__")
+
+@before.each_scenario
+def new_cache(scenario):
+    world.cache = CompletionCache(max_results=100)
+
+@step('At most (\d+) suggestions are requested')
+def given_max_results(step, max_results):
+    world.cache = CompletionCache(max_results=int(max_results))
+
+@step('Cached suggestions for prefix "(\w*)":')
+def given_cached_suggestions(step, prefix):
+    completions = [{"name": s['word'], "isCallable": False,
+                    "typeInfo": {"name": "Int"}} for s in step.hashes]
+    world.cache.store("context", prefix, completions)
+
+@step('Cached suggestions for prefix "(\w*)" out of at most (\d+):')
+def given_cached_suggestions_out_of(step, prefix, max_results):
+    completions = [{"name": s['word'], "isCallable": False,
+                    "typeInfo": {"name": "Int"}} for s in step.hashes]
+    world.cache.store("context", prefix, completions, int(max_results))
+
+@step('We complete the prefix "(\w*)" in (the same|another) context')
+def complete_prefix(step, prefix, which):
+    context = "context" if which == "the same" else "elsewhere"
+    world.suggestions = world.cache.lookup(context, prefix)
+
+@step('We get the suggestions (.+)')
+def check_suggestions(step, words):
+    tc.assertEqual([s["word"] for s in world.suggestions], words.split(", "))
+
+@step('We need to ask the server')
+def check_cache_miss(step):
+    tc.assertIsNone(world.suggestions)
@@ -0,0 +1,24 @@
+Feature: Index typecheck errors by file and line
+  In order to show the error under the cursor whenever it moves
+  We need to find it without going through every error
+
+  Scenario Outline: Find the error at the cursor
+    Given Errors in "/src/A.scala":
+      | line | begin | end | message      |
+      | 3    | 4     | 10  | outer        |
+      | 3    | 6     | 8   | inner        |
+      | 3    | 12    | 15  | next         |
+      | 7    | 0     | 5   | other line   |
+    When We look for an error at line <line> column <col> of "<file>"
+    Then We find the error <message>
+
+  Examples:
+    | line | col | file          | message    |
+    | 3    | 4   | /src/A.scala  | outer      |
+    | 3    | 6   | /src/A.scala  | inner      |
+    | 3    | 8   | /src/A.scala  | outer      |
+    | 3    | 10  | /src/A.scala  | none       |
+    | 3    | 14  | /src/A.scala  | next       |
+    | 7    | 4   | /src/A.scala  | other line |
+    | 4    | 4   | /src/A.scala  | none       |
+    | 3    | 4   | /src/B.scala  | none       |
@@ -0,0 +1,23 @@
+from lettuce import *
+from ensime_shared.errors import Error, ErrorIndex
+from unittest import TestCase
+
+tc = TestCase("__init__")
+
+@step('Errors in "(.+)":')
+def given_errors(step, path):
+    world.errors = ErrorIndex()
+    for e in step.hashes:
+        world.errors.add(Error(path, e["message"], int(e["line"]),
+                               int(e["begin"]), int(e["end"])))
+
+@step('We look for an error at line (\d+) column (\d+) of "(.+)"')
+def look_for_error(step, line, col, path):
+    world.error = world.errors.at(path, (int(line), int(col)))
+
+@step('We find the error (.+)')
+def check_error(step, message):
+    if message == "none":
+        tc.assertIsNone(world.error)
+    else:
+        tc.assertEqual(world.error.message, message)
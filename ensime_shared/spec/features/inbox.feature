@@ -0,0 +1,28 @@
+Feature: Prioritize the messages received
+  In order to handle responses quickly during a flood of notes
+  We need to serve messages by lane without starving any of them
+
+  Scenario: Responses overtake the notes queued before them
+    Given 300 "NewScalaNotesEvent" events are received
+    And 0.6 seconds have passed
+    And A response to call 1 is received
+    When We take 1 message from the inbox
+    Then We get the messages "response 1"
+    And 300 messages are still waiting
+
+  Scenario: Messages are served by lane, in order within each lane
+    Given A "NewScalaNotesEvent" event is received
+    And A "IndexerReadyEvent" event is received
+    And A response to call 1 is received
+    And A "FullTypeCheckCompleteEvent" event is received
+    And A response to call 2 is received
+    When We take 5 messages from the inbox
+    Then We get the messages "response 1, response 2, IndexerReadyEvent, NewScalaNotesEvent, FullTypeCheckCompleteEvent"
+
+  Scenario: Lower lanes keep progressing while responses keep coming
+    Given The inbox serves one message of a lower lane every 2
+    And A "NewScalaNotesEvent" event is received
+    And A "NewScalaNotesEvent" event is received
+    And Responses to calls 1 to 5 are received
+    When We take 7 messages from the inbox
+    Then We get the messages "response 1, response 2, NewScalaNotesEvent, response 3, response 4, NewScalaNotesEvent, response 5"
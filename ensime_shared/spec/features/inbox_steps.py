@@ -0,0 +1,52 @@
+import time
+from lettuce import *
+from ensime_shared.inbox import PriorityInbox
+from unittest import TestCase
+
+tc = TestCase("__init__")
+
+@before.each_scenario
+def new_inbox(scenario):
+    world.inbox = PriorityInbox()
+
+@step('The inbox serves one message of a lower lane every (\d+)')
+def given_weight(step, weight):
+    world.inbox = PriorityInbox(weight=int(weight))
+
+@step('(\d+) "(\w+)" events are received')
+def given_events(step, count, typehint):
+    for _ in range(int(count)):
+        world.inbox.put({"payload": {"typehint": typehint}})
+
+@step('A "(\w+)" event is received')
+def given_event(step, typehint):
+    world.inbox.put({"payload": {"typehint": typehint}})
+
+@step('([\d.]+) seconds have passed')
+def given_time_passed(step, seconds):
+    time.sleep(float(seconds))
+
+@step('A response to call (\d+) is received')
+def given_response(step, call_id):
+    world.inbox.put({"callId": int(call_id), "payload": {"typehint": "SymbolInfo"}})
+
+@step('Responses to calls (\d+) to (\d+) are received')
+def given_responses(step, first, last):
+    for call_id in range(int(first), int(last) + 1):
+        world.inbox.put({"callId": call_id, "payload": {"typehint": "SymbolInfo"}})
+
+@step('We take (\d+) messages? from the inbox')
+def take_messages(step, count):
+    world.taken = [world.inbox.get(block=False) for _ in range(int(count))]
+
+@step('We get the messages "(.+)"')
+def check_messages(step, messages):
+    def describe(message):
+        if message.get("callId") is not None:
+            return "response {}".format(message["callId"])
+        return message["payload"]["typehint"]
+    tc.assertEqual([describe(m) for m in world.taken], messages.split(", "))
+
+@step('(\d+) messages are still waiting')
+def check_waiting(step, count):
+    tc.assertEqual(world.inbox.qsize(), int(count))
@@ -0,0 +1,61 @@
+Feature: Scan Scala source lines
+  In order to send the symbol under the cursor without moving it
+  We need to find identifiers, completion prefixes and packages in the text
+
+  Scenario Outline: Identifier under the cursor
+    Given The source line "<line>"
+    When We look for the identifier at column <col>
+    Then We get the identifier "<identifier>"
+
+  Examples:
+    | line                   | col | identifier |
+    | val foo = bar.baz(1)   | 4   | foo        |
+    | val foo = bar.baz(1)   | 16  | baz        |
+    | x `type` y             | 4   | `type`     |
+    | a ++ b                 | 3   | ++         |
+    | def unary_! = 1        | 10  | unary_!    |
+    | val λx = 2             | 5   | λx         |
+
+  Scenario Outline: No identifier under the cursor
+    Given The source line "<line>"
+    When We look for the identifier at column <col>
+    Then We get no identifier
+
+  Examples:
+    | line                   | col |
+    | val s = "a string"     | 11  |
+    | f(x) // comment        | 9   |
+    | val x = 42             | 8   |
+
+  Scenario Outline: Start of a completion
+    Given The source line "<line>"
+    When We complete at column <col>
+    Then The completion starts at column <start>
+
+  Examples:
+    | line        | col | start |
+    | foo.ba      | 6   | 4     |
+    | foo.        | 4   | 4     |
+    | List(ba     | 7   | 5     |
+    | val x = Lis | 11  | 8     |
+
+  Scenario: Package clauses
+    Given A source file with the lines:
+      | line             |
+      | /* License       |
+      |  * header */     |
+      | package foo.bar  |
+      | package baz      |
+      |                  |
+      | import qux._     |
+      | package ignored  |
+    When We extract its package clauses
+    Then We get the package foo.bar.baz
+
+  Scenario: Package objects are not package clauses
+    Given A source file with the lines:
+      | line             |
+      | package foo      |
+      | package object x |
+    When We extract its package clauses
+    Then We get the package foo
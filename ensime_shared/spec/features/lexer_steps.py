@@ -0,0 +1,43 @@
+# coding: utf-8
+from lettuce import *
+from ensime_shared import lexer
+from unittest import TestCase
+
+tc = TestCase("__init__")
+
+@step('The source line "(.*)"')
+def given_source_line(step, line):
+    world.line = line
+
+@step('We look for the identifier at column (\d+)')
+def look_for_identifier(step, col):
+    world.span = lexer.identifier_span(world.line, int(col))
+
+@step('We get the identifier "(.+)"')
+def check_identifier(step, identifier):
+    start, end = world.span
+    tc.assertEqual(world.line[start:end], identifier)
+
+@step('We get no identifier')
+def check_no_identifier(step):
+    tc.assertIsNone(world.span)
+
+@step('We complete at column (\d+)')
+def complete_at(step, col):
+    world.start = lexer.completion_start(world.line, int(col))
+
+@step('The completion starts at column (\d+)')
+def check_completion_start(step, start):
+    tc.assertEqual(world.start, int(start))
+
+@step('A source file with the lines:')
+def given_source_file(step):
+    world.lines = [l['line'] for l in step.hashes]
+
+@step('We extract its package clauses')
+def extract_package_clauses(step):
+    world.package = ".".join(lexer.package_clauses(world.lines))
+
+@step('We get the package (.+)')
+def check_package(step, package):
+    tc.assertEqual(world.package, package)
@@ -0,0 +1,59 @@
+Feature: Convert between buffer positions and offsets
+  In order to send positions to the server and jump to the ones it returns
+  We need to convert rows and columns to offsets in the text and back
+
+  Scenario Outline: Offset of a position
+    Given A buffer with the lines:
+      | line         |
+      | package foo  |
+      |              |
+      | object Bar { |
+      | }            |
+    When We index its lines
+    Then The position <row>:<col> is at offset <offset>
+    And The offset <offset> is at position <row>:<col>
+
+  Examples:
+    | row | col | offset |
+    | 1   | 0   | 0      |
+    | 1   | 8   | 8      |
+    | 2   | 0   | 12     |
+    | 3   | 7   | 20     |
+    | 4   | 0   | 26     |
+
+  Scenario: Offsets past the end are on the last line
+    Given A buffer with the lines:
+      | line |
+      | a    |
+      | bc   |
+    When We index its lines
+    Then The offset 10 is at position 2:8
+
+  Scenario: Offsets follow the changes of a mirrored buffer
+    Given A buffer with the lines:
+      | line         |
+      | package foo  |
+      | object Bar { |
+      | }            |
+    When We mirror the buffer
+    And Lines 1 to 2 of the mirror are replaced by:
+      | line         |
+      | import x._   |
+      |              |
+      | object Baz { |
+    Then The mirror has 5 lines
+    And The offset 25 of the mirror is at position 4:1
+
+  Scenario: Previews of changes leave the mirrored buffer alone
+    Given A buffer with the lines:
+      | line         |
+      | package foo  |
+      | object Bar { |
+      | }            |
+    When We mirror the buffer
+    And Lines 1 to 2 of the mirror are previewed by:
+      | line         |
+      | object Baz { |
+      |   val x = 1  |
+    Then The mirror has 3 lines
+    And The offset 12 of the mirror is at position 2:0
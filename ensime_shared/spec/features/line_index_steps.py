@@ -0,0 +1,41 @@
+from lettuce import *
+from ensime_shared.buffer import BufferMirror, LineIndex
+from unittest import TestCase
+
+tc = TestCase("__init__")
+
+@step('A buffer with the lines:')
+def given_buffer_lines(step):
+    world.lines = [l['line'] for l in step.hashes]
+
+@step('We index its lines')
+def index_lines(step):
+    world.index = LineIndex(world.lines)
+
+@step('The position (\d+):(\d+) is at offset (\d+)')
+def check_offset(step, row, col, offset):
+    tc.assertEqual(world.index.offset(int(row), int(col)), int(offset))
+
+@step('The offset (\d+) is at position (\d+):(\d+)')
+def check_position(step, offset, row, col):
+    tc.assertEqual(world.index.position(int(offset)), (int(row), int(col)))
+
+@step('We mirror the buffer')
+def mirror_buffer(step):
+    world.mirror = BufferMirror(1, world.lines)
+
+@step('Lines (\d+) to (\d+) of the mirror are (replaced|previewed) by:')
+def replace_mirror_lines(step, first, last, change):
+    lines = [l['line'] for l in step.hashes]
+    # A preview on screen has no changedtick
+    changedtick = 2 if change == "replaced" else None
+    world.mirror.apply(changedtick, int(first), int(last), lines)
+
+@step('The mirror has (\d+) lines')
+def check_mirror_lines(step, count):
+    tc.assertEqual(len(world.mirror.content().split("\n")), int(count))
+
+@step('The offset (\d+) of the mirror is at position (\d+):(\d+)')
+def check_mirror_position(step, offset, row, col):
+    position = world.mirror.index().position(int(offset))
+    tc.assertEqual(position, (int(row), int(col)))
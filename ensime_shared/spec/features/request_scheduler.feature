@@ -0,0 +1,56 @@
+Feature: Schedule the requests to send
+  In order not to flood the server with requests nobody waits for anymore
+  We need to supersede cursor-driven requests and bound the send queue
+
+  Scenario: A request waiting to be sent is coalesced into a newer one
+    Given A TypeAtPointReq request 1 is submitted
+    When A TypeAtPointReq request 2 is submitted
+    Then The submission coalesces "1" and supersedes ""
+    And The requests waiting to be sent are "2"
+
+  Scenario: A request in flight is superseded by a newer one
+    Given A TypeAtPointReq request 1 is submitted
+    And Request 1 is sent
+    When A TypeAtPointReq request 2 is submitted
+    Then The submission coalesces "" and supersedes "1"
+    And The requests waiting to be sent are "2"
+
+  Scenario: A request already answered is not superseded
+    Given A TypeAtPointReq request 1 is submitted
+    And Request 1 is sent
+    And Request 1 is answered
+    When A TypeAtPointReq request 2 is submitted
+    Then The submission coalesces "" and supersedes ""
+
+  Scenario: Requests of other kinds don't supersede each other
+    Given A TypeAtPointReq request 1 is submitted
+    And A SymbolAtPointReq request 2 is submitted
+    When A TypecheckFilesReq request 3 is submitted
+    And A TypecheckFilesReq request 4 is submitted
+    Then The submission coalesces "" and supersedes ""
+    And The requests waiting to be sent are "1, 2, 3, 4"
+
+  Scenario: Requests are rejected once the queue is full
+    Given At most 2 requests can wait to be sent
+    And A TypecheckFilesReq request 1 is submitted
+    And A TypeAtPointReq request 2 is submitted
+    When A TypecheckFilesReq request 3 is submitted
+    Then The submission is rejected as the queue is full
+    And The requests waiting to be sent are "1, 2"
+
+  Scenario: A request coalesced into is accepted even if the queue is full
+    Given At most 2 requests can wait to be sent
+    And A TypecheckFilesReq request 1 is submitted
+    And A TypeAtPointReq request 2 is submitted
+    When A TypeAtPointReq request 3 is submitted
+    Then The submission coalesces "2" and supersedes ""
+    And The requests waiting to be sent are "1, 3"
+
+  Scenario: Requests put back go in front of the queue
+    Given A TypecheckFilesReq request 1 is submitted
+    And A TypecheckFilesReq request 2 is submitted
+    And Request 1 is sent
+    And Request 2 is sent
+    And A TypecheckFilesReq request 3 is submitted
+    When The sent requests are put back
+    Then The requests waiting to be sent are "1, 2, 3"
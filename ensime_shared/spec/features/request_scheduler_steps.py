@@ -0,0 +1,61 @@
+from lettuce import *
+from ensime_shared.errors import SendQueueFullError
+from ensime_shared.futures import ResponseFuture
+from ensime_shared.scheduler import RequestScheduler
+from unittest import TestCase
+
+tc = TestCase("__init__")
+
+@before.each_scenario
+def new_scheduler(scenario):
+    world.scheduler = RequestScheduler()
+    world.requests = {}
+    world.sent = []
+
+@step('At most (\d+) requests can wait to be sent')
+def given_max_queued(step, max_queued):
+    world.scheduler = RequestScheduler(max_queued=int(max_queued))
+
+@step('A (\w+) request (\d+) is submitted')
+def submit_request(step, typehint, call_id):
+    future = ResponseFuture(int(call_id), {"typehint": typehint})
+    world.requests[int(call_id)] = future
+    world.rejection = None
+    try:
+        world.submission = world.scheduler.submit(future, "message")
+    except SendQueueFullError as e:
+        world.rejection = e
+
+@step('Request (\d+) is sent')
+def send_request(step, call_id):
+    future, _ = world.scheduler.next(0)
+    tc.assertEqual(future.call_id, int(call_id))
+    world.sent.append((future, "message"))
+
+@step('Request (\d+) is answered')
+def answer_request(step, call_id):
+    world.requests[int(call_id)].set_result({"typehint": "TypeInfo"})
+
+@step('The sent requests are put back')
+def requeue_requests(step):
+    world.scheduler.requeue(world.sent)
+
+def call_ids(futures):
+    return ", ".join(str(f.call_id) for f in futures)
+
+@step('The submission coalesces "([\d, ]*)" and supersedes "([\d, ]*)"')
+def check_submission(step, coalesced, superseded):
+    tc.assertEqual(call_ids(world.submission[0]), coalesced)
+    tc.assertEqual(call_ids(world.submission[1]), superseded)
+
+@step('The submission is rejected as the queue is full')
+def check_rejection(step):
+    tc.assertIsInstance(world.rejection, SendQueueFullError)
+    tc.assertEqual(world.scheduler.rejected, 1)
+
+@step('The requests waiting to be sent are "([\d, ]*)"')
+def check_queued(step, queued):
+    futures = []
+    while len(world.scheduler):
+        futures.append(world.scheduler.next(0)[0])
+    tc.assertEqual(call_ids(futures), queued)
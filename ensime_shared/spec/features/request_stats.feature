@@ -0,0 +1,35 @@
+Feature: Request latency statistics
+  In order to tell where the time spent on a request goes
+  We need to summarize the latencies of each stage with percentiles
+
+  Scenario Outline: Nearest-rank percentiles
+    Given Latency samples of 1 to 100 ms for TypeAtPointReq server
+    When We summarize the statistics
+    Then The p<p> of TypeAtPointReq server is <latency> ms
+
+  Examples:
+    | p  | latency |
+    | 50 | 50.0    |
+    | 95 | 95.0    |
+    | 99 | 99.0    |
+
+  Scenario: Only the latest samples are kept
+    Given At most 10 samples are kept
+    And Latency samples of 1 to 100 ms for TypeAtPointReq server
+    When We summarize the statistics
+    Then The p50 of TypeAtPointReq server is 95.0 ms
+
+  Scenario: Requests are counted once handled
+    Given Latency samples of 1 to 3 ms for CompletionsReq total
+    And Latency samples of 1 to 5 ms for CompletionsReq server
+    When We summarize the statistics
+    Then CompletionsReq has been handled 3 times
+
+  Scenario: Events are counted in the report
+    Given 3 occurrences of "prefetch sent"
+    And 2 occurrences of "prefetch used"
+    Then The report has the line "events: prefetch sent 3, prefetch used 2"
+
+  Scenario: Backlogs carried over are reported
+    Given Ticks carrying over 40, 12, 3 messages
+    Then The report has the line "carried over: 3 ticks, 55 messages, peak backlog 40"
@@ -0,0 +1,46 @@
+from lettuce import *
+from ensime_shared.stats import RequestStats
+from unittest import TestCase
+
+tc = TestCase("__init__")
+
+@before.each_scenario
+def new_stats(scenario):
+    world.stats = RequestStats()
+
+@step('At most (\d+) samples are kept')
+def given_max_samples(step, max_samples):
+    world.stats = RequestStats(int(max_samples))
+
+@step('Latency samples of (\d+) to (\d+) ms for (\w+) (\w+)')
+def given_samples(step, first, last, name, stage):
+    for ms in range(int(first), int(last) + 1):
+        world.stats.record(name, stage, ms / 1000.0)
+
+@step('We summarize the statistics')
+def summarize(step):
+    world.summary = dict((row["name"], row) for row in world.stats.summary())
+
+@step('The p(\d+) of (\w+) (\w+) is ([\d.]+) ms')
+def check_percentile(step, p, name, stage, latency):
+    index = [50, 95, 99].index(int(p))
+    stages = world.summary[name]["stages"]
+    tc.assertEqual(stages[stage][index], float(latency))
+
+@step('(\w+) has been handled (\d+) times')
+def check_count(step, name, count):
+    tc.assertEqual(world.summary[name]["count"], int(count))
+
+@step('(\d+) occurrences of "([\w ]+)"')
+def given_events(step, count, event):
+    for _ in range(int(count)):
+        world.stats.count(event)
+
+@step('The report has the line "(.+)"')
+def check_report_line(step, line):
+    tc.assertIn(line, world.stats.report())
+
+@step('Ticks carrying over ([\d, ]+) messages')
+def given_carried_over(step, backlogs):
+    for backlog in backlogs.split(", "):
+        world.stats.carried_over(int(backlog))
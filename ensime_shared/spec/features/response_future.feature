@@ -0,0 +1,40 @@
+Feature: Wait for the responses to requests
+  In order to handle the response to a request where it was sent
+  We need futures that can be waited for, timed out and cancelled
+
+  Scenario: The response arrived is returned
+    Given A future for call 1
+    When The payload "TypeInfo" arrives
+    Then Waiting for the future gives "TypeInfo"
+
+  Scenario: Waiting for a response that doesn't arrive times out
+    Given A future for call 1
+    Then Waiting for the future gives a timeout
+
+  Scenario: A cancelled future drops the late response
+    Given A future for call 1
+    When The future is cancelled
+    And The payload "TypeInfo" arrives
+    Then The cancellation is accepted
+    And The payload is dropped
+    And Waiting for the future gives a cancellation
+
+  Scenario: A future that is done can't be cancelled
+    Given A future for call 1
+    When The payload "TypeInfo" arrives
+    And The future is cancelled
+    Then The cancellation is refused
+    And Waiting for the future gives "TypeInfo"
+
+  Scenario: Callbacks are called once the future is done
+    Given A future for call 1
+    And A callback is added to the future
+    When The payload "TypeInfo" arrives
+    And The payload "SymbolInfo" arrives
+    Then The callback was called 1 time
+
+  Scenario: Callbacks added once the future is done are called right away
+    Given A future for call 1
+    And The future is cancelled
+    When A callback is added to the future
+    Then The callback was called 1 time
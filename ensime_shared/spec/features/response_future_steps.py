@@ -0,0 +1,47 @@
+from lettuce import *
+from ensime_shared.errors import CallCancelledError, CallTimeoutError
+from ensime_shared.futures import ResponseFuture
+from unittest import TestCase
+
+tc = TestCase("__init__")
+
+@before.each_scenario
+def new_callbacks(scenario):
+    world.callbacks = []
+
+@step('A future for call (\d+)')
+def given_future(step, call_id):
+    world.future = ResponseFuture(int(call_id), {"typehint": "TypeAtPointReq"})
+
+@step('The payload "(\w+)" arrives')
+def payload_arrives(step, typehint):
+    world.resolved = world.future.set_result({"typehint": typehint})
+
+@step('The future is cancelled')
+def cancel_future(step):
+    world.cancelled = world.future.cancel()
+
+@step('A callback is added to the future')
+def add_callback(step):
+    world.future.add_done_callback(world.callbacks.append)
+
+@step('The cancellation is (accepted|refused)')
+def check_cancellation(step, outcome):
+    tc.assertEqual(world.cancelled, outcome == "accepted")
+
+@step('The payload is dropped')
+def check_dropped(step):
+    tc.assertFalse(world.resolved)
+
+@step('Waiting for the future gives "(\w+)"')
+def check_result(step, typehint):
+    tc.assertEqual(world.future.result(0.05)["typehint"], typehint)
+
+@step('Waiting for the future gives a (timeout|cancellation)')
+def check_failure(step, failure):
+    error = CallTimeoutError if failure == "timeout" else CallCancelledError
+    tc.assertRaises(error, world.future.result, 0.05)
+
+@step('The callback was called (\d+) times?')
+def check_callbacks(step, count):
+    tc.assertEqual(world.callbacks, [world.future] * int(count))
@@ -0,0 +1,182 @@
+# coding: utf-8
+
+"""
+Latency statistics of the requests sent to the ENSIME server.
+
+Each request goes through these stages, timed per request `typehint`:
+
+- ``send``: from ``send_request`` until the writer thread sent it.
+- ``server``: until its response is received, i.e. transport and server.
+- ``inbox``: until the response is taken from the inbox to be handled.
+- ``handler``: time spent in the callbacks and handler.
+- ``total``: from ``send_request`` until the response is handled.
+
+Responses claimed by their sender skip the inbox. The duration of the
+``unqueue`` ticks that handled messages is kept under the ``unqueue`` name.
+"""
+
+import json
+import math
+import threading
+import time
+from collections import deque
+
+STAGES = ("send", "server", "inbox", "handler", "total")
+
+
+def percentile(samples, p):
+    """Nearest-rank `p` percentile of sorted `samples`."""
+    if not samples:
+        return None
+    rank = int(math.ceil(p / 100.0 * len(samples)))
+    return samples[max(rank, 1) - 1]
+
+
+class RequestStats(object):
+    """Thread-safe latency samples and traffic counters.
+
+    At most `max_samples` latest samples are kept per name and stage.
+    """
+
+    def __init__(self, max_samples=1000):
+        self.max_samples = max_samples
+        self.started_at = time.time()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.messages_in = 0
+        self.messages_out = 0
+        self.events = {}
+        self.carried_ticks = 0
+        self.carried_messages = 0
+        self.peak_backlog = 0
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._counts = {}
+        self._received = {}
+
+    def record(self, name, stage, seconds):
+        """Add a sample of `seconds` spent by `name` in `stage`."""
+        with self._lock:
+            key = (name, stage)
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.max_samples)
+            samples.append(seconds)
+            if stage in ("total", "tick"):
+                self._counts[name] = self._counts.get(name, 0) + 1
+
+    def count(self, event):
+        """Count an occurrence of `event`, e.g. a speculative request used."""
+        with self._lock:
+            self.events[event] = self.events.get(event, 0) + 1
+
+    def carried_over(self, backlog):
+        """Count an ``unqueue`` tick that left `backlog` messages queued."""
+        with self._lock:
+            self.carried_ticks += 1
+            self.carried_messages += backlog
+            self.peak_backlog = max(self.peak_backlog, backlog)
+
+    def inbound(self, size):
+        with self._lock:
+            self.bytes_in += size
+            self.messages_in += 1
+
+    def outbound(self, size):
+        with self._lock:
+            self.bytes_out += size
+            self.messages_out += 1
+
+    def sent(self, future):
+        """Time the `send` stage of a request just sent."""
+        self.record(future.typehint, "send", future.sent_at - future.queued_at)
+
+    def received(self, future):
+        """Time the `server` stage of a response, tracked until handled."""
+        if future.sent_at:
+            self.record(future.typehint, "server",
+                        future.received_at - future.sent_at)
+        if not future.claimed:
+            with self._lock:
+                self._received[future.call_id] = future
+
+    def take(self, call_id):
+        """Return the future of a queued response about to be handled."""
+        with self._lock:
+            return self._received.pop(call_id, None)
+
+    def handled(self, future, started):
+        """Time the handling of a response that started at `started`."""
+        now = time.time()
+        if not future.claimed:
+            self.record(future.typehint, "inbox", started - future.received_at)
+        self.record(future.typehint, "handler", now - started)
+        self.record(future.typehint, "total", now - future.queued_at)
+
+    def summary(self):
+        """Rows of name, count and p50/p95/p99 per stage, by name.
+
+        Latencies are in milliseconds.
+        """
+        with self._lock:
+            samples = dict((k, sorted(v)) for k, v in self._samples.items())
+            counts = dict(self._counts)
+
+        rows = []
+        for name in sorted(set(name for name, _ in samples)):
+            stages = {}
+            for stage, values in samples.items():
+                if stage[0] == name:
+                    stages[stage[1]] = [round(percentile(values, p) * 1000, 1)
+                                        for p in (50, 95, 99)]
+            rows.append({
+                "name": name,
+                "count": counts.get(name, 0),
+                "stages": stages,
+            })
+        return rows
+
+    def report(self, depths=None):
+        """Lines of a human readable summary.
+
+        `depths` maps the names of queues to the number of items waiting.
+        """
+        lines = ["{} in ({} bytes), {} out ({} bytes) in {:.0f}s".format(
+            self.messages_in, self.bytes_in, self.messages_out,
+            self.bytes_out, time.time() - self.started_at)]
+        if depths:
+            lines.append("queued: " + ", ".join(
+                "{} {}".format(k, v) for k, v in sorted(depths.items())))
+        if self.carried_ticks:
+            lines.append("carried over: {} ticks, {} messages, peak backlog {}".format(
+                self.carried_ticks, self.carried_messages, self.peak_backlog))
+        if self.events:
+            lines.append("events: " + ", ".join(
+                "{} {}".format(k, v) for k, v in sorted(self.events.items())))
+        rows = self.summary()
+        for row in rows:
+            stages = " ".join(
+                "{} {}/{}/{}".format(stage, *row["stages"][stage])
+                for stage in STAGES + ("tick",) if stage in row["stages"])
+            lines.append("{} x{}: {}".format(row["name"], row["count"], stages))
+        if rows:
+            lines.append("latencies in ms as p50/p95/p99")
+        return lines
+
+    def export(self, path, depths=None):
+        """Write the statistics to `path` as JSON."""
+        with open(path, "w") as f:
+            json.dump({
+                "started_at": self.started_at,
+                "exported_at": time.time(),
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "messages_in": self.messages_in,
+                "messages_out": self.messages_out,
+                "queued": depths or {},
+                "events": self.events,
+                "carried_ticks": self.carried_ticks,
+                "carried_messages": self.carried_messages,
+                "peak_backlog": self.peak_backlog,
+                "requests": self.summary(),
+            }, f, indent=2, sort_keys=True)
@@ -4,6 +4,34 @@
 Functions for symbols formatting.
 """
 
+from collections import OrderedDict
+
+
+class BoundedCache(object):
+    """Memoizes a function of hashable arguments.
+
+    Beyond `maxsize` results, the least recently used one is evicted.
+    """
+
+    def __init__(self, fn, maxsize):
+        self.fn = fn
+        self.maxsize = maxsize
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, *args):
+        try:
+            result = self.results.pop(args)
+            self.hits += 1
+        except KeyError:
+            result = self.fn(*args)
+            self.misses += 1
+            if len(self.results) >= self.maxsize:
+                self.results.popitem(last=False)
+        self.results[args] = result
+        return result
+
 
 def completion_to_suggest(completion):
     """Convert from a completion to a suggestion."""
@@ -40,10 +68,20 @@ def formatted_completion_type(completion):
 
 def formatted_param_section(section):
     """Format a parameters list. Supports the implicit list"""
-    implicit = "implicit " if section["isImplicit"] else ""
-    s_params = [(p[0], formatted_param_type(p[1])) for p in section["params"]]
+    params = tuple((p[0], p[1]["name"]) for p in section["params"])
+    return _param_section(section["isImplicit"], params)
+
+def _format_param_section(is_implicit, params):
+    implicit = "implicit " if is_implicit else ""
+    s_params = [(pname, short_type_name(pt_name)) for pname, pt_name in params]
     return "({}{})".format(implicit, concat_params(s_params))
 
+
+# Sections and types of the members of `Predef` and of the collections come
+# back in most completions, their formats are shared by all of them
+_param_section = BoundedCache(_format_param_section, maxsize=2048)
+
+
 def concat_params(params):
     """Return list of params from list of (pname, ptype)."""
     name_and_types = [": ".join(p) for p in params]
@@ -51,10 +89,14 @@ def concat_params(params):
 
 def formatted_param_type(ptype):
     """Return the short name for a type. Special treatment for by-name and var args"""
-    pt_name = ptype["name"]
+    return short_type_name(ptype["name"])
+
+def _short_type_name(pt_name):
     if pt_name.startswith("<byname>"):
         pt_name = pt_name.replace("<byname>[", "=> ")[:-1]
     elif pt_name.startswith("<repeated>"):
         pt_name = pt_name.replace("<repeated>[", "")[:-1] + "*"
     return pt_name
 
+
+short_type_name = BoundedCache(_short_type_name, maxsize=4096)
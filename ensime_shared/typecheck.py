@@ -2,6 +2,7 @@
 
 import os
 import json
+import time
 from ensime_shared.errors import Error
 from ensime_shared.config import commands
 
@@ -10,11 +11,37 @@ class TypecheckHandler(object):
     def __init__(self):
         self.currently_buffering_typechecks = False
         self.buffered_notes = {}
+        self.typecheck_files = []
+        # Notes are rendered as they arrive, unless buffered until complete
+        self.stream_notes = bool(int(self.get_setting("stream_notes", 1)))
+        # Notes of the ongoing typecheck by absolute path, and how many of
+        # those of a file have been rendered in its buffer
+        self.streamed_notes = {}
+        self.rendered_notes = None
+        self.notes_rendered_at = 0
+        self.notes_redraw_interval = 0.2  # seconds
+        # Neovim highlights errors in a namespace of the buffer
+        self.error_namespace = None
+        if int(self.vim_eval("has_namespaces")):
+            self.error_namespace = self.vim.api.create_namespace("ensime-errors")
         super(TypecheckHandler, self).__init__()
 
+    def handles(self, typehint):
+        """Notes are only of use during a typecheck, streamed or buffered."""
+        if typehint == "NewScalaNotesEvent" and not self.currently_buffering_typechecks:
+            return False
+        return super(TypecheckHandler, self).handles(typehint)
+
     def buffer_typechecks(self, call_id, payload):
-        """Adds typecheck events to the buffer"""
-        if self.currently_buffering_typechecks:
+        """Adds typecheck events to the buffer, or streams them"""
+        if not self.currently_buffering_typechecks:
+            return
+        if self.stream_notes:
+            for note in payload['notes']:
+                path = os.path.abspath(note['file'])
+                self.streamed_notes.setdefault(path, []).append(note)
+            self.render_streamed_notes()
+        else:
             for note in payload['notes']:
                 self.buffered_notes['notes'].append(note)
 
@@ -25,17 +52,60 @@ class TypecheckHandler(object):
             self.buffered_notes = {
                 'notes': []
             }
+            self.streamed_notes = {}
+            self.rendered_notes = None
+
+    def unrendered_notes(self):
+        """Return the streamed notes of the current file not rendered yet.
+
+        All of them are once the buffer has changed, e.g. after going to
+        another buffer and back, since leaving it cleans the errors.
+        """
+        current_file = os.path.abspath(self.path())
+        notes = self.streamed_notes.get(current_file, [])
+        rendered = 0
+        if self.rendered_notes and self.rendered_notes[0] == current_file:
+            rendered = self.rendered_notes[1]
+        self.rendered_notes = (current_file, len(notes))
+        return notes[rendered:]
+
+    def render_streamed_notes(self, force=False):
+        """Render the notes of the current file streamed since the last redraw.
+
+        Redraws happen at most once per `notes_redraw_interval`, notes
+        arriving meanwhile wait for the next one, unless `force` is given.
+        """
+        now = time.time()
+        if not self.streamed_notes or \
+                (not force and now - self.notes_rendered_at < self.notes_redraw_interval):
+            return
+        notes = self.unrendered_notes()
+        if not notes:
+            return
+        self.log("render_streamed_notes: {} notes", len(notes))
+        self.render_notes({'notes': notes})
+        self.notes_rendered_at = now
+        self.vim_command("redraw_changes")
+
+    def render_notes(self, notes):
+        """Passes notes to the relevant display function."""
+        if int(self.vim_eval('syntastic_available')):
+            self.__handle_new_scala_notes_event_with_syntastic(None, notes)
+        else:
+            self.__handle_new_scala_notes_event(None, notes)
 
     def handle_typecheck_complete(self, call_id, payload):
         """Passes the buffer to relevant display function & clears the flag+buffer"""
         if self.currently_buffering_typechecks:
-            if self.vim_eval('syntastic_available'):
-                self.__handle_new_scala_notes_event_with_syntastic(None, self.buffered_notes)
+            if self.stream_notes:
+                self.render_notes({'notes': self.unrendered_notes()})
             else:
-                self.__handle_new_scala_notes_event(None, self.buffered_notes)
+                self.render_notes(self.buffered_notes)
 
             self.currently_buffering_typechecks = False
             self.buffered_notes = {}
+            self.streamed_notes = {}
+            self.rendered_notes = None
             self.vim.command(commands["redraw"])
 
     def __handle_new_scala_notes_event_with_syntastic(self, call_id, payload):
@@ -66,15 +136,46 @@ class TypecheckHandler(object):
     def __handle_new_scala_notes_event(self, call_id, payload):
         """Handler for response `NewScalaNotesEvent`."""
         current_file = os.path.abspath(self.path())
+        positions = []
         for note in payload["notes"]:
             l = note["line"]
             c = note["col"] - 1
             e = note["col"] + (note["end"] - note["beg"] + 1)
 
             if current_file == os.path.abspath(note["file"]):
-                self.errors.append(Error(note["file"], note["msg"], l, c, e))
-                matcher = commands["enerror_matcher"].format(l, c, e)
-                match = self.vim.eval(matcher)
-                add_match_msg = "adding match {} at line {} column {} error {}"
-                self.log(add_match_msg.format(match, l, c, e))
-                self.matches.append(match)
+                self.errors.add(Error(note["file"], note["msg"], l, c, e))
+                positions.append((l, note["col"], e - note["col"]))
+        self.highlight_errors(positions)
+
+    def highlight_errors(self, positions):
+        """Highlight errors at `(line, column, length)` positions at once.
+
+        Columns are 1-based. Neovim gets all the highlights in one atomic
+        call, Vim all the position matches in one expression.
+        """
+        if not positions:
+            return
+        self.log("highlight_errors: {} errors", len(positions))
+        if self.error_namespace is not None:
+            self.vim.api.call_atomic([
+                ["nvim_buf_add_highlight",
+                 [0, self.error_namespace, "EnErrorStyle", l - 1, c - 1, c - 1 + n]]
+                for l, c, n in positions])
+        else:
+            # matchaddpos() takes at most 8 positions
+            chunks = [[list(p) for p in positions[i:i + 8]]
+                      for i in range(0, len(positions), 8)]
+            matcher = commands["enerror_matchaddpos"].format(json.dumps(chunks))
+            self.matches.extend(self.vim.eval(matcher))
+
+    def clear_error_highlights(self):
+        """Remove the highlights of errors, leaving other matches alone."""
+        if self.error_namespace is not None:
+            self.vim.api.buf_clear_namespace(0, self.error_namespace, 0, -1)
+        elif self.matches:
+            # Matches are local to the window they were added to
+            ids = set(str(m) for m in self.matches)
+            live = [m["id"] for m in self.vim.eval("getmatches()")
+                    if str(m["id"]) in ids]
+            if live:
+                self.vim.eval(commands["enerror_matchdelete"].format(json.dumps(live)))
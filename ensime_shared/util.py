@@ -24,21 +24,16 @@ class Util:
             os.makedirs(path)
 
     @staticmethod
-    def extract_package_name(lines):
-        found_package = False
-        package = ""
-
-        for line in lines:
-            if "package" not in line and not found_package:
-                continue
-            elif "package" in line:
-                if not package:
-                    package = line.split("package ")[-1].replace("\n", "")
-                else:
-                    package += "." + line.split("package ")[-1].replace("\n", "")
-            else:
-                break
-        return package
+    def pages(iterable, size):
+        """Iterate over lists of up to `size` items taken from `iterable`."""
+        page = []
+        for item in iterable:
+            page.append(item)
+            if len(page) == size:
+                yield page
+                page = []
+        if page:
+            yield page
 
 @contextmanager
 def catch(exception, handler=lambda e: None):
@@ -56,3 +51,9 @@ def module_exists(module_name):
         res = True
     return res
 
+
+def get_setting(vim, key, default):
+    """Return the value of the global setting `g:ensime_<key>`, or `default`."""
+    gkey = "g:ensime_{}".format(key)
+    key_exists = int(vim.eval("exists('{}')".format(gkey)))
+    return vim.eval(gkey) if key_exists else default
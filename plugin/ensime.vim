@@ -12,11 +12,36 @@ else
         echohl None
         finish
     endif
-
-    " Defer to the rplugin for Neovim
-    if has('nvim') | finish | endif
 endif
 
+" Triggers are matched here, other keystrokes never reach the plugin
+function! s:match_prefetch_trigger() abort
+    let triggers = get(g:, 'ensime_completion_triggers', ['.'])
+    let b:ensime_prefetch = index(map(copy(triggers), 'v:val[-1:]'), v:char) >= 0
+endfunction
+
+function! s:prefetch_completions() abort
+    if get(b:, 'ensime_prefetch', 0)
+        let b:ensime_prefetch = 0
+        call EnPrefetchCompletions(line('.'), col('.') - 1, getline('.'),
+                    \ get(b:, 'ensime_insert_tick', -1))
+    endif
+endfunction
+
+augroup ensime_completion
+    autocmd!
+    " Completions are cached for an insert session, the buffer may have
+    " changed anywhere outside of them
+    autocmd InsertEnter *.scala let b:ensime_insert_tick = b:changedtick
+    if get(g:, 'ensime_completion_prefetch', 1)
+        autocmd InsertCharPre *.scala call s:match_prefetch_trigger()
+        autocmd TextChangedI *.scala call s:prefetch_completions()
+    endif
+augroup END
+
+" Defer to the rplugin for Neovim
+if has('nvim') | finish | endif
+
 augroup ensime
     autocmd!
     autocmd VimLeave *.scala call ensime#au_vim_leave(expand("<afile>"))
@@ -49,6 +74,7 @@ command! -nargs=* -range EnDebugContinue call ensime#com_en_debug_continue([<f-a
 command! -nargs=* -range EnDebugSetBreak call ensime#com_en_debug_set_break([<f-args>], '')
 command! -nargs=* -range EnDebugStart call ensime#com_en_debug_start([<f-args>], '')
 command! -nargs=0 -range EnClients call ensime#com_en_clients([<f-args>], '')
+command! -nargs=? -range EnStats call ensime#com_en_stats([<f-args>], '')
 command! -nargs=* -range EnToggleFullType call ensime#com_en_toggle_fulltype([<f-args>], '')
 command! -nargs=* -range EnOrganizeImports call ensime#com_en_organize_imports([<f-args>], '')
 command! -nargs=* -range EnAddImport call ensime#com_en_add_import([<f-args>], '')
@@ -61,6 +87,10 @@ function! EnCompleteFunc(a, b) abort
     return ensime#fun_en_complete_func(a:a, a:b)
 endfunction
 
+function! EnPrefetchCompletions(row, col, line, insert_tick) abort
+    return ensime#fun_en_prefetch_completions(a:row, a:col, a:line, a:insert_tick)
+endfunction
+
 let g:loaded_ensime = 1
 
 " vim:set et sw=4 ts=4 tw=78:
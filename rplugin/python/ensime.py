@@ -146,6 +146,10 @@ class NeovimEnsime(Ensime):
     def com_en_clients(self, *args, **kwargs):
         super(NeovimEnsime, self).com_en_clients(*args, **kwargs)
 
+    @neovim.command('EnStats', range='', nargs='?', sync=True)
+    def com_en_stats(self, *args, **kwargs):
+        super(NeovimEnsime, self).com_en_stats(*args, **kwargs)
+
     @neovim.autocmd('VimEnter', **autocmd_params)
     def au_vim_enter(self, *args, **kwargs):
         super(NeovimEnsime, self).au_vim_enter(*args, **kwargs)
@@ -166,6 +170,22 @@ class NeovimEnsime(Ensime):
     def au_cursor_moved(self, *args, **kwargs):
         super(NeovimEnsime, self).au_cursor_moved(*args, **kwargs)
 
+    @neovim.rpc_export('nvim_buf_lines_event')
+    def on_buf_lines_event(self, *args):
+        super(NeovimEnsime, self).on_buf_lines_event(*args)
+
+    @neovim.rpc_export('nvim_buf_changedtick_event')
+    def on_buf_changedtick_event(self, *args):
+        super(NeovimEnsime, self).on_buf_changedtick_event(*args)
+
+    @neovim.rpc_export('nvim_buf_detach_event')
+    def on_buf_detach_event(self, *args):
+        super(NeovimEnsime, self).on_buf_detach_event(*args)
+
     @neovim.function('EnCompleteFunc', sync=True)
     def fun_en_complete_func(self, *args, **kwargs):
         return super(NeovimEnsime, self).fun_en_complete_func(*args, **kwargs)
+
+    @neovim.function('EnPrefetchCompletions', sync=False)
+    def fun_en_prefetch_completions(self, *args, **kwargs):
+        super(NeovimEnsime, self).fun_en_prefetch_completions(*args, **kwargs)